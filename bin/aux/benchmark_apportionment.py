@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Apportionment time of each method on hc.pm.METHODS, for 230 and 1000 seats
+and a small and a large number of parties. Exits with an error if any
+method takes longer than BUDGET_MS to apportion the seats.
+'''
+
+##
+# Imports
+
+import sys
+import os.path
+import timeit
+
+sys.path.append(os.path.abspath('../../lib/'))
+
+from hc.pm import METHODS, apportion
+
+##
+# Config
+
+REPEAT = 5
+NUMBER = 20
+
+# Latency budget of a single apportionment, in milliseconds
+BUDGET_MS = 5.0
+
+VOTES = [2085465, 1747730, 550945, 445901, 75170, 60045, 57995, 39340,
+         22691, 20793, 18115, 15811, 13899, 7496, 4862, 4568, 3286, 2834,
+         1823, 1129]
+
+##
+# Benchmark
+
+
+if __name__ == '__main__':
+    over_budget = []
+
+    print '%-22s %6s %8s %9s' % ('method', 'seats', 'parties', 'ms')
+    for method in sorted(METHODS):
+        for seats in (230, 1000):
+            for parties in (6, len(VOTES)):
+                votes = VOTES[:parties]
+                t = min(timeit.repeat(lambda: apportion(seats, votes, method),
+                                      repeat=REPEAT, number=NUMBER))
+                ms = t / NUMBER * 1e3
+                print '%-22s %6d %8d %9.3f' % (method, seats, parties, ms)
+                if ms > BUDGET_MS:
+                    over_budget.append((method, seats, parties))
+
+    if over_budget:
+        print 'Over the %.1f ms budget: %s' % (BUDGET_MS, over_budget)
+        sys.exit(1)
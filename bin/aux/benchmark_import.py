@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Import time of the bundled 1975-2011 election files, saving a row at a
+time (as the import script used to) and with the import_election_results
+management command, and re-importing them with --incremental. Runs on a
+test database.
+'''
+
+##
+# Imports
+
+import csv
+import sys
+import os.path
+import datetime
+import time
+
+sys.path.append(os.path.abspath('../../lib/'))
+sys.path.append(os.path.abspath('../../labs_django/'))
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'labs_django.settings'
+
+import django
+django.setup()
+
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from hcapp.models import (Party, District, ElectionResult, ElectionStats,
+                          ImportDigest)
+from hcapp.parties import PARTY_INFO
+from hcapp.management.commands.import_election_results import (
+    RESULTS_FILE, STATS_FILE)
+
+##
+# Config
+
+REPEAT = 3
+
+##
+# Benchmark
+
+
+def clear():
+    for model in (ElectionResult, ElectionStats, Party, District,
+                  ImportDigest):
+        model.objects.all().delete()
+
+
+def row_import():
+    '''The import loop of the old import script, without the prints'''
+    districts = []
+    parties = []
+    with transaction.atomic():
+        for row in csv.reader(open(RESULTS_FILE)):
+            code = int(row[0])
+            party_initials = row[4].replace('.', '')
+
+            if code not in districts:
+                district = District(code=code, name=row[1].upper())
+                district.save()
+                districts.append(code)
+            else:
+                district = District.objects.get(code=code)
+
+            if party_initials not in parties:
+                party = Party(initials=party_initials,
+                              **PARTY_INFO[party_initials])
+                party.save()
+                parties.append(party_initials)
+            else:
+                party = Party.objects.get(initials=party_initials)
+
+            ElectionResult(
+                district=district, party=party,
+                election_type=row[2].lower(),
+                date=datetime.datetime.strptime(row[3], '%Y-%m-%d').date(),
+                votes=int(row[5]), vote_percent=float(row[6]),
+                seats=int(row[7])).save()
+
+    districts = dict((district.code, district)
+                     for district in District.objects.all())
+    with transaction.atomic():
+        for row in csv.reader(open(STATS_FILE)):
+            ElectionStats(
+                district=districts[int(row[0])],
+                date=datetime.datetime.strptime(row[2], '%Y-%m-%d').date(),
+                registered_voters=int(row[3]), voters=int(row[4]),
+                blank_voters=int(row[5]), invalid_votes=int(row[6])).save()
+
+
+def bulk_import(**options):
+    call_command('import_election_results', stdout=StringIO(), **options)
+
+
+def timed(function):
+    times = []
+    for i in range(REPEAT):
+        clear()
+        start = time.time()
+        function()
+        times.append(time.time() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    test_db = connection.creation.create_test_db(verbosity=0)
+    try:
+        print 'Import of the bundled files (s, best of %d)' % REPEAT
+        print '    %-12s %8.3f' % ('row by row', timed(row_import))
+        print '    %-12s %8.3f' % ('bulk', timed(bulk_import))
+
+        start = time.time()
+        bulk_import()
+        print '    %-12s %8.3f' % ('no new data', time.time() - start)
+
+        # The first incremental import reads every election to record its
+        # digest, the next ones only read the elections that changed
+        bulk_import(incremental=True)
+        start = time.time()
+        bulk_import(incremental=True)
+        print '    %-12s %8.3f' % ('incremental', time.time() - start)
+    finally:
+        connection.creation.destroy_test_db(test_db, verbosity=0)
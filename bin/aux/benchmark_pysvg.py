@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Memory and construction time of the pysvg elements used by the hemicycle
+drawings.
+'''
+
+##
+# Imports
+
+import sys
+import os.path
+import timeit
+
+sys.path.append(os.path.abspath('../../lib/'))
+
+from pysvg.structure import g, use
+from pysvg.shape import path
+from pysvg.builders import TransformBuilder
+
+##
+# Config
+
+N = 10000
+
+##
+# Benchmark
+
+
+def element_size(element):
+    '''Bytes used by an element, its attributes and its children list'''
+    size = sys.getsizeof(element)
+    if hasattr(element, '__dict__'):
+        size += sys.getsizeof(element.__dict__)
+    size += sys.getsizeof(element._attributes)
+    size += sys.getsizeof(element._subElements)
+    return size
+
+
+def make_use():
+    th = TransformBuilder()
+    th.setRotation('12.000000')
+    th.setTranslation('100.000000,200.000000')
+
+    u = use()
+    u._attributes['xlink:href'] = '#PS'
+    u.set_transform(th.getTransform())
+    return u
+
+
+if __name__ == '__main__':
+    print 'Element memory (bytes)'
+    for name, element in (('use', make_use()),
+                          ('g', g()),
+                          ('path', path(pathData='M 0,0 L 1,1 z'))):
+        print '    %-6s %6d' % (name, element_size(element))
+
+    print
+    print 'Construction time (us per element, %d elements)' % N
+    for name, stmt in (('use', 'make_use()'),
+                       ('g', 'g()'),
+                       ('path', 'path(pathData="M 0,0 L 1,1 z")')):
+        t = min(timeit.repeat(stmt, 'from __main__ import make_use, g, path',
+                              repeat=5, number=N))
+        print '    %-6s %6.2f' % (name, t / N * 1e6)
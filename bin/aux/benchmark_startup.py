@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Start up time of the WSGI application: loading it, importing the URLconf
+(and so the views) and serving the first /hc/ request. Each run is made on
+a new process. Also reports the queries made before the first request.
+'''
+
+##
+# Imports
+
+import sys
+import os.path
+import subprocess
+import time
+
+##
+# Config
+
+REPEAT = 5
+
+##
+# Benchmark
+
+
+def startup():
+    '''Runs on the child process, prints the timings'''
+    sys.path.append(os.path.abspath('../../lib/'))
+    sys.path.append(os.path.abspath('../../labs_django/'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'labs_django.settings')
+
+    start = time.time()
+    from labs_django.wsgi import application
+    loaded = time.time()
+
+    from django.core.urlresolvers import get_resolver
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        get_resolver(None).url_patterns
+    imported = time.time()
+
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    Client().get('/hc/')
+    first_request = time.time()
+
+    print '%f %f %f %d' % (loaded - start, imported - loaded,
+                           first_request - imported, len(queries))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--child']:
+        startup()
+        sys.exit()
+
+    runs = []
+    for i in range(REPEAT):
+        output = subprocess.check_output([sys.executable, __file__, '--child'])
+        runs.append([float(value) for value in output.split()[-4:]])
+
+    print 'WSGI start up (ms, best of %d runs)' % REPEAT
+    for i, name in enumerate(('load application', 'import URLconf',
+                              'first request')):
+        print '    %-18s %8.2f' % (name, min(run[i] for run in runs) * 1e3)
+    print '    %-18s %8d' % ('queries at import', runs[0][3])
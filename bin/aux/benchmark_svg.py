@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Size and serialization time of the hemicycle SVG documents, with the
+default and the compact output modes. The original mode writes the chairs
+as they were written before the chair template, with every number padded
+to six decimal places, as the size reference.
+'''
+
+##
+# Imports
+
+import sys
+import os.path
+import timeit
+import zlib
+
+sys.path.append(os.path.abspath('../../lib/'))
+
+from math import pi, sin, cos
+
+from hc.pm import hondt_method
+from hc.chairs import Hemicycle, hemicycle_rows
+from hc.draw import TRANSX, TRANSY, HemicycleSGV, degrees
+
+##
+# Config
+
+REPEAT = 5
+NUMBER = 10
+
+VOTES = [('PSD', 2159181), ('PS', 1566347), ('CDS', 653888),
+         ('CDU', 441147), ('BE', 288923), ('PAN', 57995)]
+
+MODES = (('original', False, 6),
+         ('default', False, 6),
+         ('compact', True, 3),
+         ('compact', True, 2))
+
+##
+# Benchmark
+
+
+class OriginalSGV(HemicycleSGV):
+    '''Chairs written with the transform of the original chair_svg'''
+
+    def chair_xml(self, location, href, width, height):
+        angle, x, y = location
+        x = x + width / 2 - 30 * sin(angle) + TRANSX
+        y = height - y - 30 * cos(angle) + TRANSY
+        return ('<use xlink:href="%s" transform="translate(%f,%f) '
+                'rotate(%f) "  />\n' % (href, x, y, 90 - degrees(angle)))
+
+
+def make_svg(seats, name, compact, precision):
+    parties = [{'initials': initials, 'votes': votes, 'order': order,
+                'color_1': 'red', 'color_2': 'white'}
+               for order, (initials, votes) in enumerate(VOTES)]
+    hondt_method(seats, parties)
+
+    hc = Hemicycle(chair_width=60, chair_height=60, nchairs=seats,
+                   nrows=hemicycle_rows(seats), hangle=pi)
+    sgv = OriginalSGV if name == 'original' else HemicycleSGV
+    hc_svg = sgv(hc, parties, compact=compact, precision=precision)
+    hc_svg.chair_dist()
+    return hc_svg
+
+
+if __name__ == '__main__':
+    print '%6s %-8s %4s %9s %6s %9s %9s' % ('seats', 'mode', 'prec', 'bytes',
+                                             'size', 'deflated', 'ms')
+    for seats in (230, 1000):
+        original = None
+        for name, compact, precision in MODES:
+            hc_svg = make_svg(seats, name, compact, precision)
+            svg = ''.join(hc_svg.iter_svg())
+            t = min(timeit.repeat(lambda: ''.join(hc_svg.iter_svg()),
+                                  repeat=REPEAT, number=NUMBER))
+            if original is None:
+                original = len(svg)
+            print '%6d %-8s %4d %9d %5.1f%% %9d %9.2f' % (
+                seats, name, precision, len(svg), 100.0 * len(svg) / original,
+                len(zlib.compress(svg, 6)), t / NUMBER * 1e3)
@@ -0,0 +1 @@
+default_app_config = 'hcapp.apps.HcappConfig'
@@ -0,0 +1,11 @@
+from __future__ import unicode_literals
+
+from django.apps import AppConfig
+
+
+class HcappConfig(AppConfig):
+    name = 'hcapp'
+
+    def ready(self):
+        # Connect the allocation cache invalidation signals
+        import hcapp.cache
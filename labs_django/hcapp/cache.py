@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+'''
+Seat allocation cache.
+
+The seat allocation of an election depends only on the election date, the
+number of seats, the national circle size and the apportionment method.
+The allocations are kept on an in-process LRU cache and, if
+HC_ALLOCATION_CACHE_BACKEND names a cache from settings.CACHES, on that
+Django cache too so they are shared between workers.
+
+The district allocations, before the national circle, are cached apart,
+so changing the national circle only reruns the national circle itself
+when the seats left to the districts were already allocated.
+
+The same cache keeps the compressed variants of the live rendered
+hemicycle SVGs, so each one is compressed only once.
+
+The caches are invalidated whenever the election data changes, the
+imports must call invalidate_caches.
+
+The data stamp identifies the election data version, it's used on the
+ETags of the hemicycle views. It's read from the database again every
+HC_DATA_STAMP_TTL seconds, so the changes made by other processes, as
+the imports, are seen even without HC_ALLOCATION_CACHE_BACKEND. The
+caches are cleared when it changes.
+
+The election data store keeps every election in memory, as an
+ElectionSnapshot, so the allocations are computed without touching the
+database. It's loaded on first use and again when the data stamp changes.
+'''
+
+# Global imports
+import threading
+import time
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max, Sum
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+# Local imports
+from hc.pm import DHONDT
+from hcapp.models import Party, ElectionResult, ElectionStats
+from hcapp.snapshot import ElectionSnapshot
+
+##
+# Config
+
+CACHE_SIZE = getattr(settings, 'HC_ALLOCATION_CACHE_SIZE', 1024)
+CACHE_BACKEND = getattr(settings, 'HC_ALLOCATION_CACHE_BACKEND', None)
+CACHE_TIMEOUT = getattr(settings, 'HC_ALLOCATION_CACHE_TIMEOUT', None)
+SVG_CACHE_SIZE = getattr(settings, 'HC_SVG_CACHE_SIZE', 256)
+STAMP_TTL = getattr(settings, 'HC_DATA_STAMP_TTL', 10)
+DISTRICT_CACHE_SIZE = getattr(settings, 'HC_DISTRICT_CACHE_SIZE', 1024)
+
+VERSION_KEY = 'hc_allocation_version'
+
+##
+# Cache
+
+
+class AllocationCache(object):
+    '''
+    LRU cache for the seat allocations, keyed by
+    (date, seats, national_circle, method).
+    '''
+
+    def __init__(self, size=CACHE_SIZE, backend=CACHE_BACKEND,
+                 prefix='hc_allocation'):
+        self.size = size
+        self.prefix = prefix
+        self.backend = caches[backend] if backend else None
+        self.lru = OrderedDict()
+        self.lock = threading.Lock()
+
+    def version(self):
+        '''
+        Data version, shared between workers through the Django cache.
+        '''
+        if self.backend is None:
+            return 0
+        return self.backend.get(VERSION_KEY, 0)
+
+    def get(self, date, seats, national_circle, method=DHONDT):
+        key = (self.version(), date.isoformat(), seats, national_circle,
+               method)
+
+        with self.lock:
+            value = self.lru.pop(key, None)
+            if value is not None:
+                self.lru[key] = value
+                return value
+
+        if self.backend is None:
+            return None
+
+        value = self.backend.get(self.backend_key(key))
+        if value is not None:
+            self.store(key, value)
+        return value
+
+    def set(self, date, seats, national_circle, value, method=DHONDT):
+        key = (self.version(), date.isoformat(), seats, national_circle,
+               method)
+
+        self.store(key, value)
+        if self.backend is not None:
+            self.backend.set(self.backend_key(key), value, CACHE_TIMEOUT)
+
+    def backend_key(self, key):
+        return '%s:%d:%s:%d:%d:%s' % ((self.prefix,) + key)
+
+    def store(self, key, value):
+        with self.lock:
+            self.lru.pop(key, None)
+            self.lru[key] = value
+            while len(self.lru) > self.size:
+                self.lru.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.lru.clear()
+        if self.backend is not None:
+            try:
+                self.backend.incr(VERSION_KEY)
+            except ValueError:
+                self.backend.set(VERSION_KEY, 1, None)
+
+
+allocation_cache = AllocationCache()
+district_cache = AllocationCache(size=DISTRICT_CACHE_SIZE,
+                                prefix='hc_district')
+svg_cache = AllocationCache(size=SVG_CACHE_SIZE, prefix='hc_svg')
+
+##
+# Data stamp
+
+
+class DataStamp(object):
+    '''
+    Election data version. The ElectionResult and ElectionStats row counts,
+    last ids and totals are read at most once every ttl seconds, together
+    with the allocation cache version that is shared between workers.
+    '''
+
+    def __init__(self, ttl=STAMP_TTL):
+        self.ttl = ttl
+        self.stamp = None
+        self.checked = 0
+
+    def read(self):
+        '''The election data version on the database'''
+        results = ElectionResult.objects.aggregate(
+            Count('id'), Max('id'), Sum('votes'), Sum('seats'))
+        stats = ElectionStats.objects.aggregate(
+            Count('id'), Max('id'), Sum('registered_voters'))
+        return '%d.%d.%d.%d.%d.%d.%d' % (
+            results['id__count'], results['id__max'] or 0,
+            results['votes__sum'] or 0, results['seats__sum'] or 0,
+            stats['id__count'], stats['id__max'] or 0,
+            stats['registered_voters__sum'] or 0)
+
+    def data(self):
+        '''
+        The election data version, read again from the database once the
+        ttl expires. If it was changed by another process the caches are
+        cleared.
+        '''
+        now = time.time()
+        if self.stamp is None or now - self.checked >= self.ttl:
+            stamp = self.read()
+            if self.stamp is not None and stamp != self.stamp:
+                clear_caches()
+            self.stamp = stamp
+            self.checked = now
+        return self.stamp
+
+    def get(self):
+        return '%s.%d' % (self.data(), allocation_cache.version())
+
+    def clear(self):
+        self.stamp = None
+
+
+data_stamp = DataStamp()
+
+##
+# Election data
+
+
+class ElectionData(object):
+    '''
+    Snapshots of every election, by date, and the sorted election dates.
+
+    The data stamp, the snapshots and the dates are kept in a single tuple,
+    replaced as a whole on each load, so a thread never sees the snapshots
+    of one load with the dates of another.
+    '''
+
+    def __init__(self):
+        self.elections = (None, {}, [])
+        self.lock = threading.Lock()
+
+    def load(self):
+        '''
+        Reads the whole election data if the data stamp changed since it
+        was last read. Returns the snapshots and the dates.
+        '''
+        stamp = data_stamp.get()
+        elections = self.elections
+        if stamp == elections[0]:
+            return elections[1:]
+
+        with self.lock:
+            # Another thread may have loaded it while this one waited
+            elections = self.elections
+            if stamp == elections[0]:
+                return elections[1:]
+
+            results = {}
+            for row in ElectionResult.objects.values_list(
+                    'date', 'district__code', 'party_id', 'votes',
+                    'seats').order_by('id'):
+                results.setdefault(row[0], []).append(row[1:])
+
+            stats = {}
+            for row in ElectionStats.objects.values_list(
+                    'date', 'district__code',
+                    'registered_voters').order_by('id'):
+                stats.setdefault(row[0], []).append(row[1:])
+
+            parties = dict((party.id, party) for party in Party.objects.all())
+
+            snapshots = dict(
+                (date, ElectionSnapshot(date, results[date],
+                                        stats.get(date, []), parties))
+                for date in results)
+            self.elections = (stamp, snapshots, sorted(snapshots))
+            return self.elections[1:]
+
+    def get(self, date):
+        '''The ElectionSnapshot of the election on date, or None'''
+        snapshots, dates = self.load()
+        return snapshots.get(date)
+
+    def election_dates(self):
+        '''Sorted list of the election dates'''
+        snapshots, dates = self.load()
+        return dates
+
+    def __contains__(self, date):
+        snapshots, dates = self.load()
+        return date in snapshots
+
+    def next(self, date):
+        '''First election after date, or None'''
+        snapshots, dates = self.load()
+        i = bisect_right(dates, date)
+        return dates[i] if i < len(dates) else None
+
+    def previous(self, date):
+        '''Last election before date, or None'''
+        snapshots, dates = self.load()
+        i = bisect_left(dates, date)
+        return dates[i - 1] if i else None
+
+    def clear(self):
+        self.elections = (None,) + self.elections[1:]
+
+
+election_data = ElectionData()
+
+##
+# Invalidation
+
+
+def clear_caches():
+    '''
+    Clears the allocation caches. With HC_ALLOCATION_CACHE_BACKEND set the
+    other processes see the change too.
+    '''
+    allocation_cache.clear()
+    district_cache.clear()
+    svg_cache.clear()
+
+
+def invalidate_caches():
+    '''
+    Clears the caches of the election data, after a change made by this
+    process.
+    '''
+    clear_caches()
+    data_stamp.clear()
+    election_data.clear()
+
+
+@receiver(post_save, sender=Party)
+@receiver(post_save, sender=ElectionResult)
+@receiver(post_save, sender=ElectionStats)
+@receiver(post_delete, sender=Party)
+@receiver(post_delete, sender=ElectionResult)
+@receiver(post_delete, sender=ElectionStats)
+def invalidate_allocations(sender, **kwargs):
+    invalidate_caches()
@@ -6,10 +6,14 @@
 from django import forms
 
 # Local imports:
-from models import ElectionResult
+from hc.pm import DHONDT, SAINTE_LAGUE, MODIFIED_SAINTE_LAGUE, HARE
+from hcapp.cache import election_data
 
-date_choices = [(date['date'].isoformat(), date['date'].isoformat())
-                for date in ElectionResult.objects.all().values('date').distinct().order_by('date')]
+
+def date_choices():
+    '''Election dates, read when each form is created'''
+    return [(date.isoformat(), date.isoformat())
+            for date in election_data.election_dates()]
 
 
 class ElectionForm(forms.Form):
@@ -39,6 +43,17 @@ class ElectionForm(forms.Form):
         max_value=1000,
     )
 
+    method = forms.ChoiceField(
+        label='Método',
+        choices=(
+            (DHONDT, 'D\'Hondt'),
+            (SAINTE_LAGUE, 'Sainte-Laguë'),
+            (MODIFIED_SAINTE_LAGUE, 'Sainte-Laguë modificado'),
+            (HARE, 'Hare (maiores restos)'),
+        ),
+        initial=DHONDT,
+    )
+
     def clean(self):
         cleaned_data = super(ElectionForm, self).clean()
 
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+'''
+Builds the hemicycle geometry table, see hc.chairs.GeometryTable.
+'''
+
+# Global imports
+from django.core.management.base import BaseCommand
+
+# Local imports
+from hc.chairs import build_table, TABLE_FILE, TABLE_FIRST, TABLE_LAST
+
+
+class Command(BaseCommand):
+    help = ('Solves the hemicycles for every number of seats the site '
+            'allows and writes them to the geometry table.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=TABLE_FILE,
+                            help='Table file, %s by default' % TABLE_FILE)
+        parser.add_argument('--first', type=int, default=TABLE_FIRST)
+        parser.add_argument('--last', type=int, default=TABLE_LAST)
+
+    def handle(self, *args, **options):
+        build_table(options['output'], options['first'], options['last'])
+        self.stdout.write('Hemicycles from %d to %d seats written to %s' % (
+            options['first'], options['last'], options['output']))
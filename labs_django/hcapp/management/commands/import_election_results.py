@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+'''
+Imports the election results and stats CSV files.
+
+The files are read a row at a time and the rows are inserted in batches
+with bulk_create, all in a single transaction. The districts and parties
+are read once, the missing ones are created as they're found.
+
+The elections already on the database are skipped, or replaced with
+--update, so the same files can be imported again to add new elections.
+
+With --incremental the rows of each election are hashed and compared with
+the digest of the last import (see hcapp.models.ImportDigest). Only the
+elections whose rows changed are read from the database, and only their
+new, changed or removed rows are written.
+
+hcapp has no migrations, the ImportDigest table is created with
+manage.py migrate on Django 1.8 and manage.py migrate --run-syncdb on
+Django 1.9 and later. Until then the digests aren't recorded and
+--incremental stops with an error.
+'''
+
+# Global imports
+import csv
+import datetime
+import hashlib
+import os.path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+# Local imports
+from hcapp.cache import invalidate_caches
+from hcapp.models import (Party, District, ElectionResult, ElectionStats,
+                          ImportDigest)
+from hcapp.parties import PARTY_INFO
+from hcapp.svgstore import svg_store
+
+##
+# Config
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), 'static', 'data')
+RESULTS_FILE = os.path.join(DATA_DIR, 'resultados_legislativas-1975-2011.csv')
+STATS_FILE = os.path.join(
+    DATA_DIR, 'inscritos_votos_brancos_nulos_legislativas-1975-2011.csv')
+BATCH_SIZE = 500
+
+# What to do with the rows of an election
+INSERT, REPLACE, DELTA = range(3)
+
+
+class Command(BaseCommand):
+    help = ('Imports the election results and stats CSV files, skipping '
+            'the elections already imported.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--results', default=RESULTS_FILE,
+                            help='Election results CSV file')
+        parser.add_argument('--stats', default=STATS_FILE,
+                            help='Election stats CSV file')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            dest='batch_size',
+                            help='Rows inserted on each query')
+        parser.add_argument('--update', action='store_true',
+                            help='Replace the elections already imported')
+        parser.add_argument('--incremental', action='store_true',
+                            help='Write only the rows that changed on the '
+                            'elections already imported, needs the '
+                            'ImportDigest table (manage.py migrate '
+                            '--run-syncdb)')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.update = options['update']
+        self.incremental = options['incremental']
+        self.verbosity = int(options['verbosity'])
+
+        # The digests are only kept once their table is created
+        self.digests = (ImportDigest._meta.db_table in
+                        connection.introspection.table_names())
+        if self.incremental and not self.digests:
+            raise CommandError(
+                'The %s table is missing, create it with manage.py migrate '
+                '--run-syncdb (manage.py migrate on Django 1.8) to use '
+                '--incremental' % ImportDigest._meta.db_table)
+
+        try:
+            with transaction.atomic():
+                self.districts = dict((district.code, district)
+                                      for district in District.objects.all())
+                self.parties = dict((party.initials, party)
+                                    for party in Party.objects.all())
+
+                results = self.import_rows(
+                    options['results'], ElectionResult, 3,
+                    self.election_result, self.result_key,
+                    ('votes', 'vote_percent', 'seats'))
+                stats = self.import_rows(
+                    options['stats'], ElectionStats, 2,
+                    self.election_stats, self.stats_key,
+                    ('registered_voters', 'voters', 'blank_voters',
+                     'invalid_votes'))
+        except IOError as error:
+            raise CommandError(str(error))
+
+        # bulk_create doesn't send the signals that clear the caches
+        invalidate_caches()
+
+        # The pre-rendered hemicycles are out of date
+        if (results or stats) and svg_store.root:
+            svg_store.load_index()
+            if svg_store.index:
+                svg_store.clear()
+                self.stderr.write('The pre-rendered hemicycles were removed, '
+                                  'run prerender_hemicycles again.')
+
+        self.stdout.write('%d results and %d stats imported' % (
+            results, stats))
+
+    def read_rows(self, path, date_column):
+        '''Yields the line number, date and row of each row of path'''
+        with open(path, 'rb') as csv_file:
+            for line, row in enumerate(csv.reader(csv_file), 1):
+                try:
+                    date = datetime.datetime.strptime(
+                        row[date_column], '%Y-%m-%d').date()
+                except (IndexError, ValueError) as error:
+                    raise CommandError('%s line %d: %s' % (path, line, error))
+                yield line, date, row
+
+    def import_rows(self, path, model, date_column, make_object, key, fields):
+        '''
+        Imports the objects made by make_object from each row of the CSV
+        file on path, date_column is the column with the election date.
+        key gives the key of an object within its election and fields are
+        the values compared by --incremental. Returns the number of objects
+        written.
+        '''
+        # Digest of the rows of each election
+        digests = {}
+        for line, date, row in self.read_rows(path, date_column):
+            digests.setdefault(date, hashlib.sha1()).update(
+                ','.join(row) + '\n')
+        digests = dict((date, digests[date].hexdigest()) for date in digests)
+
+        existing = set(model.objects.values_list('date', flat=True).distinct())
+        imported = {}
+        if self.digests:
+            imported = dict(ImportDigest.objects.filter(
+                model=model.__name__).values_list('date', 'digest'))
+
+        actions = {}
+        for date, digest in digests.items():
+            if date not in existing:
+                actions[date] = INSERT
+            elif self.update:
+                actions[date] = REPLACE
+            elif self.incremental and imported.get(date) != digest:
+                actions[date] = DELTA
+
+        batch = []
+        delta = {}
+        count = 0
+        for line, date, row in self.read_rows(path, date_column):
+            action = actions.get(date)
+            if action is None:
+                continue
+
+            try:
+                obj = make_object(date, row)
+            except (IndexError, ValueError) as error:
+                raise CommandError('%s line %d: %s' % (path, line, error))
+
+            if action == DELTA:
+                delta.setdefault(date, []).append(obj)
+                continue
+            if action == REPLACE and date in existing:
+                model.objects.filter(date=date).delete()
+                existing.remove(date)
+
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            model.objects.bulk_create(batch)
+            count += len(batch)
+
+        for date, objects in delta.items():
+            count += self.write_delta(model, date, objects, key, fields)
+
+        for date in actions:
+            if self.digests:
+                ImportDigest.objects.update_or_create(
+                    model=model.__name__, date=date,
+                    defaults={'digest': digests[date]})
+            if self.verbosity > 1:
+                self.stdout.write('%s %s imported' % (model.__name__, date))
+
+        return count
+
+    def write_delta(self, model, date, objects, key, fields):
+        '''
+        Writes the objects of the election on date that are new or
+        changed and deletes the ones that are gone. Returns the number of
+        objects written.
+        '''
+        current = dict((key(obj), obj) for obj in
+                       model.objects.filter(date=date).select_related())
+
+        new = []
+        count = 0
+        for obj in objects:
+            old = current.pop(key(obj), None)
+            if old is None:
+                new.append(obj)
+            elif any(getattr(old, field) != getattr(obj, field)
+                     for field in fields):
+                for field in fields:
+                    setattr(old, field, getattr(obj, field))
+                old.save(update_fields=fields)
+                count += 1
+
+        model.objects.bulk_create(new, batch_size=self.batch_size)
+        if current:
+            model.objects.filter(
+                pk__in=[obj.pk for obj in current.values()]).delete()
+        return count + len(new) + len(current)
+
+    def district(self, code, name):
+        if code not in self.districts:
+            self.districts[code] = District.objects.create(code=code,
+                                                           name=name.upper())
+        return self.districts[code]
+
+    def party(self, initials):
+        if initials not in self.parties:
+            if initials not in PARTY_INFO:
+                raise CommandError('Unknown party %s' % initials)
+            self.parties[initials] = Party.objects.create(
+                initials=initials, **PARTY_INFO[initials])
+        return self.parties[initials]
+
+    def election_result(self, date, row):
+        return ElectionResult(
+            district=self.district(int(row[0]), row[1]),
+            party=self.party(row[4].replace('.', '')),
+            election_type=row[2].lower(),
+            date=date,
+            votes=int(row[5]),
+            vote_percent=float(row[6]),
+            seats=int(row[7]))
+
+    def result_key(self, result):
+        return (result.district.code, result.party.initials,
+                result.election_type)
+
+    def election_stats(self, date, row):
+        return ElectionStats(
+            district=self.district(int(row[0]), row[1]),
+            date=date,
+            registered_voters=int(row[3]),
+            voters=int(row[4]),
+            blank_voters=int(row[5]),
+            invalid_votes=int(row[6]))
+
+    def stats_key(self, stats):
+        return stats.district.code
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+'''
+Pre-renders the hemicycle SVGs into the SVG store, see hcapp.svgstore.
+'''
+
+# Global imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+# Local imports
+from hc.chairs import ChairError
+from hc.draw import SVGError
+from hcapp.models import ElectionResult
+from hcapp.svgstore import svg_store
+from hcapp.views import render_hemicycle
+
+##
+# Config
+
+SEATS = [10, 50, 100, 150, 200, 230, 250, 300, 400, 500, 750, 1000]
+
+
+class Command(BaseCommand):
+    help = ('Pre-renders the hemicycles of every election, for the real '
+            'number of seats and for the most common simulations.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', nargs='+', default=None,
+                            help='Election dates (YYYY-MM-DD), all by default')
+        parser.add_argument('--seats', nargs='+', type=int, default=SEATS,
+                            help='Simulated number of seats')
+        parser.add_argument('--national-circle', nargs='+', type=int,
+                            default=[0], dest='national_circle',
+                            help='National circle sizes')
+        parser.add_argument('--no-uni', action='store_false', dest='uni',
+                            help='Skip the single electoral circle hemicycles')
+
+    def handle(self, *args, **options):
+        if not svg_store.root:
+            raise CommandError('HC_SVG_STORE is not set.')
+
+        dates = ElectionResult.objects.values('date').annotate(
+            seats=Sum('seats')).order_by('date')
+        if options['date']:
+            dates = dates.filter(date__in=options['date'])
+
+        # The hemicycles of other election data are dropped
+        if not svg_store.is_current():
+            svg_store.index = {}
+
+        count = 0
+        for election in dates:
+            date = election['date']
+            seat_list = sorted(set([election['seats']] + options['seats']))
+
+            for seats in seat_list:
+                circles = [nc for nc in options['national_circle']
+                           if 0 <= nc < seats]
+                if options['uni']:
+                    circles.append(seats)
+
+                for national_circle in circles:
+                    try:
+                        svg = ''.join(render_hemicycle(
+                            date, seats, national_circle))
+                    except (ChairError, SVGError) as error:
+                        self.stderr.write('%s, %d seats, national circle %d: '
+                                          'could not render (%r)' % (
+                                              date, seats, national_circle,
+                                              error))
+                        continue
+                    svg_store.add(date, seats, national_circle, svg)
+                    count += 1
+
+            if int(options['verbosity']) > 1:
+                self.stdout.write('%s done' % date)
+
+        svg_store.save_index()
+        self.stdout.write('%d hemicycles in the store' % count)
@@ -52,3 +52,16 @@ class ElectionStats(models.Model):
 
     class Meta:
         unique_together = ('district', 'date')
+
+
+class ImportDigest(models.Model):
+    '''
+    Digest of the CSV rows of an election, as last imported by the
+    import_election_results command. model is the imported model name.
+    '''
+    model = models.CharField(max_length=32)
+    date = models.DateField()
+    digest = models.CharField(max_length=40)
+
+    class Meta:
+        unique_together = ('model', 'date')
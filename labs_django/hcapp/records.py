@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+'''
+Party result records.
+
+The seat allocation of an election is a list of PartyResult for each
+electoral district, the national circle and the total. The records have
+fixed fields, so they're smaller and faster to create and copy than the
+equivalent dicts.
+'''
+
+##
+# Records
+
+
+class PartyResult(object):
+    '''
+    Votes and seats of a party on an electoral district, the national
+    circle or the total.
+
+    party - the Party
+    initials, votes, result - party initials, votes and seats
+    order, color_1, color_2 - read from the party
+
+    The views add the percentages and the graph width shown on the results
+    page and HemicycleSGV the seats of each row. The fields can be read and
+    set as items too, so the records can be given to the functions that
+    take party dicts, as hc.pm.hondt_method and hc.draw.HemicycleSGV.
+    '''
+    __slots__ = ('party', 'initials', 'votes', 'result', 'percentage',
+                 'percentage_seats', 'graph', 'seats')
+
+    def __init__(self, party, votes=0, result=0):
+        self.party = party
+        self.initials = party.initials
+        self.votes = votes
+        self.result = result
+
+    @property
+    def order(self):
+        return self.party.order
+
+    @property
+    def color_1(self):
+        return self.party.color_1
+
+    @property
+    def color_2(self):
+        return self.party.color_2
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __repr__(self):
+        return '<PartyResult %s %d votes %d seats>' % (
+            self.initials, self.votes, self.result)
+
+    def copy(self):
+        '''New record with the party, votes and result'''
+        return PartyResult(self.party, self.votes, self.result)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+'''
+Election data loader.
+
+ElectionSnapshot holds the results of an election in columns, read with a
+single query without instantiating a model for each row. The totals, the
+districts and the parties are derived from those columns.
+
+The snapshots of every election are kept in memory by
+hcapp.cache.election_data.
+
+The apportionment of the seats by the districts, from their registered
+voters, is a table with a row for each number of seats up to
+APPORTIONMENT_SEATS, built with a single D'Hondt sweep when first needed.
+'''
+
+# Global imports
+from array import array
+
+from django.conf import settings
+
+# Local imports
+from hc.pm import hondt_sweep
+from hcapp.models import Party, ElectionResult, ElectionStats
+
+##
+# Config
+
+APPORTIONMENT_SEATS = getattr(settings, 'HC_APPORTIONMENT_SEATS', 1000)
+
+##
+# Snapshot
+
+
+class ElectionSnapshot(object):
+    '''
+    Results of the election on date.
+
+    district_codes, party_ids, result_votes, result_seats - columns with
+        the district code, party id, votes and seats of each result
+    parties - Party objects by id
+    total_seats - seats of the election, None if there's no election
+    votes - total votes
+    district_seats - seats of each district, by district code
+
+    The results, the registered voters (as (district code, voters)) and the
+    parties are read from the database unless given.
+    '''
+    apportionment = None
+
+    def __init__(self, date, results=None, stats=None, parties=None):
+        self.date = date
+        if results is None:
+            results = ElectionResult.objects.filter(
+                date__exact=date).values_list(
+                'district__code', 'party_id', 'votes', 'seats')
+
+        self.district_codes = []
+        self.party_ids = []
+        self.result_votes = []
+        self.result_seats = []
+        for code, party_id, votes, seats in results:
+            self.district_codes.append(code)
+            self.party_ids.append(party_id)
+            self.result_votes.append(votes)
+            self.result_seats.append(seats)
+
+        if parties is None:
+            parties = Party.objects.in_bulk(set(self.party_ids))
+        self.parties = parties
+        self.stats = stats
+
+        self.total_seats = sum(self.result_seats) if self.result_seats else None
+        self.votes = sum(self.result_votes) if self.result_votes else None
+        self.district_seats = {}
+        for code, seats in zip(self.district_codes, self.result_seats):
+            self.district_seats[code] = self.district_seats.get(code, 0) + seats
+
+    def __nonzero__(self):
+        return bool(self.district_codes)
+
+    @property
+    def rows(self):
+        '''(district code, party id, votes, seats) of each result'''
+        return zip(self.district_codes, self.party_ids, self.result_votes,
+                   self.result_seats)
+
+    def registered_voters(self):
+        '''(district code, registered voters) of each district'''
+        if self.stats is None:
+            self.stats = list(ElectionStats.objects.filter(
+                date__exact=self.date).values_list(
+                'district__code', 'registered_voters'))
+        return self.stats
+
+    def district_apportionment(self, seats):
+        '''
+        (district code, seats) of each district when seats are distributed
+        by the registered voters, with the D'Hondt method.
+        '''
+        if self.apportionment is None or seats > self.apportionment[1]:
+            self.apportionment = self.apportionment_table(
+                max(seats, APPORTIONMENT_SEATS))
+
+        codes, max_seats, table = self.apportionment
+        start = seats * len(codes)
+        return zip(codes, table[start:start + len(codes)])
+
+    def apportionment_table(self, seats):
+        '''
+        (district codes, seats, table), the table has the seats of each
+        district for 0 to seats seats, one row after the other.
+        '''
+        stats = self.registered_voters()
+        codes = [code for code, voters in stats]
+
+        district_seats = [0] * len(codes)
+        table = array('H', district_seats)
+        for i in hondt_sweep(seats, [voters for code, voters in stats]):
+            district_seats[i] += 1
+            table.extend(district_seats)
+
+        return codes, seats, table
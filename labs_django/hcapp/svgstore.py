@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+'''
+On disk store of pre-rendered hemicycle SVGs.
+
+The SVG files are content addressed, they are kept under
+HC_SVG_STORE/objects/ named after the SHA-1 of their content. The index
+file, HC_SVG_STORE/index.json, maps each (date, seats, national_circle) to
+the corresponding file.
+
+The store is filled by the prerender_hemicycles management command. The
+index records the data stamp (see hcapp.cache) of the election data the
+hemicycles were rendered from, once the data changes the store is ignored
+until the command is run again.
+
+Each SVG is also stored gzip compressed (<sha>.svg.gz) and, if the brotli
+module is installed, brotli compressed (<sha>.svg.br). The variant is
+chosen by the request Accept-Encoding.
+
+If HC_SVG_SENDFILE is set the file is sent by the web server:
+    'x-accel-redirect' - nginx, HC_SVG_SENDFILE_URL is the internal location
+                         mapped to HC_SVG_STORE, it should have gzip_static
+                         (and brotli_static) on to send the variants
+    'x-sendfile'       - apache mod_xsendfile or lighttpd
+'''
+
+# Global imports
+import gzip
+import hashlib
+import json
+import os
+import os.path
+import tempfile
+import threading
+
+from cStringIO import StringIO
+
+from django.conf import settings
+from django.http import HttpResponse, FileResponse
+
+# Local imports
+from hcapp.cache import data_stamp
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+##
+# Config
+
+STORE_DIR = getattr(settings, 'HC_SVG_STORE', None)
+SENDFILE = getattr(settings, 'HC_SVG_SENDFILE', None)
+SENDFILE_URL = getattr(settings, 'HC_SVG_SENDFILE_URL', '/hc_svg_store/')
+
+##
+# Compression
+
+
+def gzip_compress(content):
+    '''gzip with a fixed mtime, the same content gives the same file'''
+    buf = StringIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9,
+                       mtime=0) as gzip_file:
+        gzip_file.write(content)
+    return buf.getvalue()
+
+
+def brotli_compress(content):
+    return brotli.compress(content, mode=brotli.MODE_TEXT)
+
+
+# (Content-Encoding, file suffix, compressor), by order of preference
+ENCODINGS = [('gzip', '.gz', gzip_compress)]
+if brotli is not None:
+    ENCODINGS.insert(0, ('br', '.br', brotli_compress))
+
+
+def compress_svg(svg):
+    '''
+    Returns a dict with the SVG for each Content-Encoding, the plain SVG
+    is 'identity'.
+    '''
+    variants = {'identity': svg}
+    for encoding, suffix, compress in ENCODINGS:
+        variants[encoding] = compress(svg)
+    return variants
+
+
+def choose_encoding(request):
+    '''
+    Returns the preferred Content-Encoding of ENCODINGS accepted by the
+    request, or None.
+    '''
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, _, qvalue = item.partition(';')
+        qvalue = qvalue.strip().replace(' ', '')
+        if qvalue.startswith('q='):
+            try:
+                if float(qvalue[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip().lower())
+
+    for encoding, suffix, compress in ENCODINGS:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
+
+##
+# Store
+
+
+class SVGStore(object):
+    '''
+    Pre-rendered SVG store.
+    '''
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.index = {}
+        self.stamp = None
+        self.index_mtime = None
+        self.lock = threading.Lock()
+
+    def index_path(self):
+        return os.path.join(self.root, 'index.json')
+
+    def key(self, date, seats, national_circle):
+        return '%s:%d:%d' % (date.isoformat(), seats, national_circle)
+
+    def load_index(self):
+        '''
+        Reads the index file if it changed since it was last read.
+        '''
+        try:
+            mtime = os.path.getmtime(self.index_path())
+        except OSError:
+            self.index = {}
+            self.stamp = None
+            self.index_mtime = None
+            return
+
+        if mtime != self.index_mtime:
+            with self.lock:
+                with open(self.index_path()) as index_file:
+                    index = json.load(index_file)
+                self.index = index.get('hemicycles', {})
+                self.stamp = index.get('stamp')
+                self.index_mtime = mtime
+
+    def save_index(self):
+        '''
+        Writes the index, for the current election data.
+        '''
+        self.stamp = data_stamp.data()
+        self.write(self.index_path(), json.dumps(
+            {'stamp': self.stamp, 'hemicycles': self.index}, sort_keys=True))
+        self.index_mtime = os.path.getmtime(self.index_path())
+
+    def is_current(self):
+        '''
+        True if the hemicycles were rendered from the current election data.
+        '''
+        self.load_index()
+        return self.stamp == data_stamp.data()
+
+    def clear(self):
+        '''
+        Empties the index, the files are left on the store.
+        '''
+        self.index = {}
+        self.save_index()
+
+    def write(self, path, content):
+        '''
+        Atomic file write, the web server never sees a partial file.
+        '''
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(content)
+        os.chmod(tmp_path, 0644)
+        os.rename(tmp_path, path)
+
+    def lookup(self, date, seats, national_circle):
+        '''
+        Returns the file name relative to the store root, or None if the
+        hemicycle wasn't pre-rendered from the current election data.
+        '''
+        if not self.root or not self.is_current():
+            return None
+
+        digest = self.index.get(self.key(date, seats, national_circle))
+        if digest is None:
+            return None
+        return os.path.join('objects', digest[:2], '%s.svg' % digest)
+
+    def add(self, date, seats, national_circle, svg):
+        '''
+        Stores an SVG, the index is only written by save_index.
+        '''
+        digest = hashlib.sha1(svg).hexdigest()
+        path = os.path.join(self.root, 'objects', digest[:2],
+                            '%s.svg' % digest)
+        if not os.path.exists(path):
+            self.write(path, svg)
+        for encoding, suffix, compress in ENCODINGS:
+            if not os.path.exists(path + suffix):
+                self.write(path + suffix, compress(svg))
+
+        self.index[self.key(date, seats, national_circle)] = digest
+
+    def response(self, svg_file, encoding=None):
+        '''
+        Response sending svg_file, or its variant for encoding if it's on
+        the store.
+        '''
+        if SENDFILE == 'x-accel-redirect':
+            # nginx picks the variant itself
+            response = HttpResponse(content_type='image/svg+xml')
+            response['X-Accel-Redirect'] = SENDFILE_URL + svg_file
+            return response
+
+        suffix = dict((e[0], e[1]) for e in ENCODINGS).get(encoding)
+        if suffix and os.path.exists(
+                os.path.join(self.root, svg_file + suffix)):
+            svg_file += suffix
+        else:
+            encoding = None
+
+        if SENDFILE == 'x-sendfile':
+            response = HttpResponse(content_type='image/svg+xml')
+            response['X-Sendfile'] = os.path.join(self.root, svg_file)
+        else:
+            response = FileResponse(open(os.path.join(self.root, svg_file), 'rb'),
+                                    content_type='image/svg+xml')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return response
+
+
+svg_store = SVGStore()
@@ -5,7 +5,59 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import json
+import os.path
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+
+from math import cos, degrees, floor, pi, sin
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import F, Sum
+from django.test import TestCase, skipUnlessDBFeature
+
+from hc.chairs import GEOMETRY, Hemicycle, hemicycle_rows
+from hc.draw import HemicycleSGV, format_number
+from hc.pm import (DHONDT, HARE, METHODS, MODIFIED_SAINTE_LAGUE,
+                   SAINTE_LAGUE, apportion, apportionment_matrix,
+                   apportionment_sweep, hondt_method, hondt_matrix,
+                   hondt_sweep)
+from hcapp.cache import (allocation_cache, data_stamp, district_cache,
+                         election_data, svg_cache)
+from hcapp.forms import ElectionForm
+from hcapp.models import (Party, District, ElectionResult, ElectionStats,
+                          ImportDigest)
+from hcapp.records import PartyResult
+from hcapp.snapshot import ElectionSnapshot
+from hcapp.svgstore import svg_store
+
+
+# hcapp.views is only imported from the tests, once the test database
+# exists, so the tests don't depend on what the views module does on import
+
+
+def calc_election_results(*args, **kwargs):
+    from hcapp.views import calc_election_results
+    return calc_election_results(*args, **kwargs)
+
+
+def last_election():
+    from hcapp.views import last_election
+    return last_election()
+
+
+def process_election_results(*args, **kwargs):
+    from hcapp.views import process_election_results
+    return process_election_results(*args, **kwargs)
 
 
 class SimpleTest(TestCase):
@@ -14,3 +66,967 @@ class SimpleTest(TestCase):
         Tests that 1 + 1 always equals 2.
         """
         self.assertEqual(1 + 1, 2)
+
+
+class HondtMethodTest(TestCase):
+    def parties(self):
+        return [
+            {'initials': 'CDS', 'votes': 36602},
+            {'initials': 'FEC', 'votes': 2003},
+            {'initials': 'MDP', 'votes': 12849},
+            {'initials': 'MES', 'votes': 3269},
+            {'initials': 'PCP', 'votes': 10479},
+            {'initials': 'PPD', 'votes': 141872},
+            {'initials': 'PS',  'votes': 105098},
+            {'initials': 'PUP', 'votes': 1694},
+        ]
+
+    def test_aveiro_1975(self):
+        """
+        Aveiro, 1975 legislative elections.
+        """
+        result = dict((party['initials'], party['result'])
+                      for party in hondt_method(14, self.parties()))
+        self.assertEqual(result['PPD'], 7)
+        self.assertEqual(result['PS'], 5)
+        self.assertEqual(result['CDS'], 2)
+        self.assertEqual(sum(result.values()), 14)
+
+    def test_no_seats(self):
+        parties = hondt_method(0, self.parties())
+        self.assertEqual([party['initials'] for party in parties],
+                         [party['initials'] for party in self.parties()])
+        self.assertTrue(all(party['result'] == 0 for party in parties))
+
+    def test_ties(self):
+        """
+        On a tie the seat goes to the party that got a seat last, or to the
+        first one on the list if none got a seat yet.
+        """
+        parties = [{'initials': 'A', 'votes': 100},
+                   {'initials': 'B', 'votes': 100}]
+        result = hondt_method(1, parties)
+        self.assertEqual([(party['initials'], party['result'])
+                          for party in result],
+                         [('A', 1), ('B', 0)])
+
+        parties = [{'initials': 'A', 'votes': 100},
+                   {'initials': 'B', 'votes': 200}]
+        result = hondt_method(2, parties)
+        self.assertEqual([(party['initials'], party['result'])
+                          for party in result],
+                         [('B', 2), ('A', 0)])
+
+    def test_matrix(self):
+        votes = [[party['votes'] for party in self.parties()],
+                 [100, 200]]
+        self.assertEqual(hondt_matrix(votes, [14, 2]),
+                         [[2, 0, 0, 0, 0, 7, 5, 0], [0, 2]])
+
+    def test_sweep(self):
+        for votes in ([party['votes'] for party in self.parties()],
+                      [100, 200, 100, 50]):
+            winners = hondt_sweep(30, votes)
+            self.assertEqual(len(winners), 30)
+            for seats in range(31):
+                self.assertEqual(
+                    [winners[:seats].count(i) for i in range(len(votes))],
+                    hondt_matrix([votes], [seats])[0])
+
+
+class ApportionmentTest(TestCase):
+    votes = [100000, 80000, 30000, 20000]
+
+    def test_methods(self):
+        for method, result in ((DHONDT, [4, 3, 1, 0]),
+                               (SAINTE_LAGUE, [3, 3, 1, 1]),
+                               (MODIFIED_SAINTE_LAGUE, [4, 3, 1, 0]),
+                               (HARE, [3, 3, 1, 1])):
+            self.assertEqual(apportion(8, self.votes, method)[0], result)
+
+    def test_modified_sainte_lague(self):
+        """
+        The first divisor, 1.4, keeps the smaller parties out.
+        """
+        votes = [100, 25]
+        self.assertEqual(apportion(3, votes, SAINTE_LAGUE)[0], [2, 1])
+        self.assertEqual(apportion(3, votes, MODIFIED_SAINTE_LAGUE)[0],
+                         [3, 0])
+
+    def test_hare(self):
+        self.assertEqual(apportion(3, [1, 1, 1], HARE)[0], [1, 1, 1])
+        self.assertEqual(apportion(2, [1, 1, 1], HARE)[0], [1, 1, 0])
+        self.assertEqual(apportion(2, [0, 0], HARE)[0], [2, 0])
+
+    def test_sweep(self):
+        for method in (DHONDT, SAINTE_LAGUE, MODIFIED_SAINTE_LAGUE):
+            winners = apportionment_sweep(30, self.votes, method)
+            for seats in range(31):
+                self.assertEqual(
+                    [winners[:seats].count(i) for i in range(4)],
+                    apportion(seats, self.votes, method)[0])
+        self.assertRaises(ValueError, apportionment_sweep, 30, self.votes,
+                          HARE)
+
+    def test_no_seats(self):
+        for method in METHODS:
+            self.assertEqual(apportion(0, self.votes, method),
+                             ([0, 0, 0, 0], [0, 1, 2, 3]))
+
+    def test_seats(self):
+        for method in METHODS:
+            for seats in (1, 7, 230, 1000):
+                results = apportionment_matrix([self.votes, [5, 0, 1]],
+                                               [seats, seats], method)
+                self.assertEqual(map(sum, results), [seats, seats])
+
+
+class ElectionTestCase(TestCase):
+    '''
+    Small election: two electoral districts and three parties.
+    '''
+    date = datetime.date(2011, 6, 5)
+
+    def setUp(self):
+        allocation_cache.clear()
+
+        self.districts = [
+            District.objects.create(code=10000, name='AVEIRO'),
+            District.objects.create(code=20000, name='BEJA'),
+        ]
+        self.parties = [
+            Party.objects.create(name=initials, initials=initials,
+                                 tendency='', order=order,
+                                 color_1='red', color_2='blue')
+            for order, initials in enumerate(('PS', 'PSD', 'CDU'))]
+
+        data = {10000: ((1000, 3), (800, 2), (200, 0)),
+                20000: ((300, 1), (100, 0), (250, 1))}
+        for district in self.districts:
+            for party, (votes, seats) in zip(self.parties,
+                                             data[district.code]):
+                ElectionResult.objects.create(
+                    district=district, party=party, election_type='ar',
+                    date=self.date, votes=votes, vote_percent=0,
+                    seats=seats)
+            ElectionStats.objects.create(
+                district=district, date=self.date,
+                registered_voters=district.code, voters=0, blank_voters=0,
+                invalid_votes=0)
+
+    def totals(self, results):
+        return dict((party['initials'], party['result'])
+                    for party in results['total'])
+
+
+class AllocationCacheTest(ElectionTestCase):
+    def test_cached(self):
+        results, districts_seats = process_election_results(self.date, 7, 0)
+        self.assertEqual(self.totals(results),
+                         {'PS': 4, 'PSD': 2, 'CDU': 1})
+
+        # The cached results are copies
+        results['total'][0]['result'] = 100
+        with self.assertNumQueries(0):
+            results, districts_seats = process_election_results(
+                self.date, 7, 0)
+        self.assertEqual(self.totals(results),
+                         {'PS': 4, 'PSD': 2, 'CDU': 1})
+
+    def test_invalidation(self):
+        process_election_results(self.date, 7, 0)
+
+        result = ElectionResult.objects.get(district__code=20000,
+                                            party__initials='CDU')
+        result.votes = 50
+        result.save()
+
+        results, districts_seats = process_election_results(self.date, 7, 0)
+        self.assertEqual(self.totals(results),
+                         {'PS': 5, 'PSD': 2, 'CDU': 0})
+
+
+class NationalCircleTest(ElectionTestCase):
+    def test_national_circle(self):
+        results, districts_seats = process_election_results(self.date, 7, 2)
+        self.assertEqual(sum(district['result']
+                             for district in districts_seats.values()), 5)
+        self.assertEqual(sum(party['result']
+                             for party in results['national_circle']), 2)
+        self.assertEqual(self.totals(results),
+                         {'PS': 3, 'PSD': 2, 'CDU': 2})
+
+    def test_half(self):
+        """
+        Half the seats on the national circle.
+        """
+        results, districts_seats = process_election_results(self.date, 10, 5)
+        self.assertEqual(sum(self.totals(results).values()), 10)
+        self.assertEqual(sorted(districts_seats), [10000, 20000])
+
+    def test_district_cache(self):
+        """
+        The district allocation is shared by every national circle that
+        leaves the districts the same seats.
+        """
+        district_cache.clear()
+        calc_election_results(self.date, 12, 2)
+        with self.assertNumQueries(0):
+            results = calc_election_results(self.date, 10, 0)[0]
+        self.assertEqual(len(district_cache.lru), 1)
+        self.assertNotIn('national_circle', results)
+
+        for national_circle in range(1, 10):
+            calc_election_results(self.date, 10, national_circle)
+        self.assertEqual(len(district_cache.lru), 10)
+
+
+class MethodTest(ElectionTestCase):
+    def test_cached(self):
+        for method, totals in ((DHONDT, {'PS': 3, 'PSD': 1, 'CDU': 2}),
+                               (HARE, {'PS': 3, 'PSD': 2, 'CDU': 1})):
+            results, districts_seats = process_election_results(
+                self.date, 6, 0, method=method)
+            self.assertEqual(self.totals(results), totals)
+
+    def test_views(self):
+        response = self.client.get('/hc/?date=2011-06-05&method=hare')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['method'], HARE)
+        self.assertIn('&method=hare', response.context['method_query'])
+
+        response = self.client.get(
+            '/hc/svg/?date=2011-06-05&seats=10&method=sainte-lague')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sainte-lague', response['Content-Disposition'])
+
+        for url in ('/hc/', '/hc/svg/'):
+            response = self.client.get(url + '?date=2011-06-05&method=x')
+            self.assertEqual(response.status_code, 404)
+
+
+class PartyResultTest(ElectionTestCase):
+    def test_record(self):
+        party = PartyResult(self.parties[0], 100)
+        self.assertEqual((party.initials, party.votes, party.result),
+                         ('PS', 100, 0))
+        self.assertEqual(party.color_1, 'red')
+
+        # Dict API
+        party['result'] = 2
+        self.assertEqual(party.result, 2)
+        self.assertEqual(party['order'], 0)
+        self.assertRaises(KeyError, party.__getitem__, 'graph')
+        self.assertRaises(KeyError, party.__setitem__, 'x', 1)
+
+        copy = pickle.loads(pickle.dumps(party, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual((copy.initials, copy.votes, copy.result),
+                         ('PS', 100, 2))
+
+    def test_hondt_method(self):
+        parties = [PartyResult(party, votes) for party, votes in
+                   zip(self.parties, (1000, 800, 200))]
+        result = hondt_method(5, parties)
+        self.assertEqual([(party.initials, party.result) for party in result],
+                         [('PS', 3), ('PSD', 2), ('CDU', 0)])
+
+
+class ElectionSnapshotTest(ElectionTestCase):
+    def test_snapshot(self):
+        with self.assertNumQueries(2):
+            snapshot = ElectionSnapshot(self.date)
+        self.assertTrue(snapshot)
+        self.assertEqual(snapshot.total_seats, 7)
+        self.assertEqual(snapshot.votes, 2650)
+        self.assertEqual(snapshot.district_seats, {10000: 5, 20000: 2})
+        self.assertEqual(sorted(party.initials
+                                for party in snapshot.parties.values()),
+                         ['CDU', 'PS', 'PSD'])
+
+        snapshot = ElectionSnapshot(datetime.date(2015, 10, 4))
+        self.assertFalse(snapshot)
+        self.assertEqual(snapshot.total_seats, None)
+
+    def test_election_data(self):
+        ElectionResult.objects.create(
+            district=self.districts[0], party=self.parties[0],
+            election_type='ar', date=datetime.date(2015, 10, 4), votes=1,
+            vote_percent=0, seats=1)
+
+        # Data stamp (results and stats), results, stats and parties
+        with self.assertNumQueries(5):
+            snapshot = election_data.get(self.date)
+        self.assertEqual(snapshot.rows, ElectionSnapshot(self.date).rows)
+        self.assertEqual(snapshot.registered_voters(),
+                         [(10000, 10000), (20000, 20000)])
+
+        with self.assertNumQueries(0):
+            self.assertIn(self.date, election_data)
+            self.assertNotIn(datetime.date(2011, 6, 6), election_data)
+            self.assertEqual(election_data.next(self.date),
+                             datetime.date(2015, 10, 4))
+            self.assertEqual(election_data.next(datetime.date(2015, 10, 4)),
+                             None)
+            self.assertEqual(election_data.previous(self.date), None)
+            self.assertEqual(election_data.previous(datetime.date(2013, 1, 1)),
+                             self.date)
+
+        # Reloaded when the data changes
+        result = ElectionResult.objects.get(district__code=20000,
+                                            party__initials='CDU')
+        result.votes = 50
+        result.save()
+        self.assertEqual(election_data.get(self.date).votes, 2450)
+
+    def test_other_process(self):
+        """
+        The changes made without the signals, as by another process, are
+        seen once the data stamp expires.
+        """
+        process_election_results(self.date, 7, 0)
+        self.assertEqual(election_data.get(self.date).votes, 2650)
+
+        ElectionResult.objects.filter(district__code=20000,
+                                      party__initials='CDU').update(votes=50)
+        ElectionStats.objects.filter(district__code=20000).update(
+            registered_voters=1)
+        self.assertEqual(election_data.get(self.date).votes, 2650)
+
+        data_stamp.checked = 0
+        self.assertEqual(election_data.get(self.date).votes, 2450)
+        self.assertEqual(election_data.get(self.date).registered_voters(),
+                         [(10000, 10000), (20000, 1)])
+        results, districts_seats = process_election_results(self.date, 7, 0)
+        self.assertEqual(self.totals(results),
+                         {'PS': 5, 'PSD': 2, 'CDU': 0})
+
+    def test_concurrent_load(self):
+        """
+        A thread that waited for another thread's load uses it instead of
+        reading the election data again.
+        """
+        class Lock(object):
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.waiting = threading.Event()
+
+            def __enter__(self):
+                self.waiting.set()
+                self.lock.acquire()
+
+            def __exit__(self, *args):
+                self.lock.release()
+
+        snapshots, dates = election_data.load()
+        stamp = election_data.elections[0]
+        election_data.clear()
+
+        lock = election_data.lock
+        election_data.lock = Lock()
+        loaded = []
+        try:
+            with election_data.lock.lock:
+                thread = threading.Thread(
+                    target=lambda: loaded.append(election_data.load()))
+                thread.start()
+                election_data.lock.waiting.wait()
+                election_data.elections = (stamp, snapshots, dates)
+            thread.join()
+        finally:
+            election_data.lock = lock
+
+        self.assertIs(loaded[0][0], snapshots)
+        self.assertIs(loaded[0][1], dates)
+
+    def test_district_apportionment(self):
+        snapshot = ElectionSnapshot(self.date)
+        for seats in (0, 1, 7, 10, 100, 1000, 1001):
+            demographics = [{'code': code, 'votes': voters}
+                            for code, voters in snapshot.registered_voters()]
+            self.assertEqual(
+                snapshot.district_apportionment(seats),
+                sorted((district['code'], district['result'])
+                       for district in hondt_method(seats, demographics)))
+
+
+class LastElectionTest(ElectionTestCase):
+    def test_new_election(self):
+        self.assertEqual(last_election(), '2011-06-05')
+        self.assertEqual(list(ElectionForm().fields['date'].choices),
+                         [('2011-06-05', '2011-06-05')])
+
+        # Imported by another process: bulk_create sends no signals, the
+        # change is seen once the data stamp expires
+        ElectionResult.objects.bulk_create([ElectionResult(
+            district=self.districts[0], party=self.parties[0],
+            election_type='ar', date=datetime.date(2015, 10, 4), votes=1,
+            vote_percent=0, seats=1)])
+        ElectionStats.objects.bulk_create([ElectionStats(
+            district=self.districts[0], date=datetime.date(2015, 10, 4),
+            registered_voters=1, voters=0, blank_voters=0, invalid_votes=0)])
+        data_stamp.checked = 0
+
+        self.assertEqual(last_election(), '2015-10-04')
+        self.assertEqual(list(ElectionForm().fields['date'].choices),
+                         [('2011-06-05', '2011-06-05'),
+                          ('2015-10-04', '2015-10-04')])
+        self.assertEqual(self.client.get('/hc/').context['date'],
+                         datetime.date(2015, 10, 4))
+
+
+class QueryCountTest(ElectionTestCase):
+    '''
+    Once the election data is loaded the results are computed without any
+    query.
+    '''
+    def add_district(self, code):
+        district = District.objects.create(code=code, name=str(code))
+        for party in self.parties:
+            ElectionResult.objects.create(
+                district=district, party=party, election_type='ar',
+                date=self.date, votes=100, vote_percent=0, seats=1)
+        ElectionStats.objects.create(
+            district=district, date=self.date, registered_voters=code,
+            voters=0, blank_voters=0, invalid_votes=0)
+
+    def test_calc_election_results(self):
+        for code in (30000, 40000):
+            real_seats = 7 if code == 30000 else 10
+            with self.assertNumQueries(5):
+                election_data.load()
+            with self.assertNumQueries(0):
+                calc_election_results(self.date, real_seats, 0)
+                calc_election_results(self.date, 100, 0)
+            self.add_district(code)
+
+    def test_results(self):
+        for code in (30000, 40000):
+            for seats in (0, 100):
+                allocation_cache.clear()
+                district_cache.clear()
+                election_data.load()
+                with self.assertNumQueries(0):
+                    self.client.get('/hc/?date=2011-06-05&seats=%d' % seats)
+            self.add_district(code)
+
+
+class SVGStoreTest(ElectionTestCase):
+    def setUp(self):
+        super(SVGStoreTest, self).setUp()
+        self.root = svg_store.root
+        svg_store.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(svg_store.root)
+        svg_store.root = self.root
+
+    def test_prerendered(self):
+        url = '/hc/svg/?date=2011-06-05&seats=10'
+        live = self.client.get(url)
+        live_svg = ''.join(live.streaming_content)
+
+        call_command('prerender_hemicycles', date=['2011-06-05'],
+                     seats=[10], stdout=StringIO())
+        self.assertTrue(svg_store.lookup(self.date, 10, 0))
+        self.assertTrue(svg_store.lookup(self.date, 10, 10))
+
+        prerendered = self.client.get(url)
+        self.assertEqual(''.join(prerendered.streaming_content), live_svg)
+        self.assertEqual(prerendered['Content-Disposition'],
+                         live['Content-Disposition'])
+
+        prerendered = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(prerendered['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', prerendered['Vary'])
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(''.join(
+            prerendered.streaming_content))).read(), live_svg)
+
+    def test_data_change(self):
+        """
+        The store is ignored once the election data changes.
+        """
+        call_command('prerender_hemicycles', date=['2011-06-05'],
+                     seats=[10], stdout=StringIO())
+        self.assertTrue(svg_store.lookup(self.date, 10, 0))
+
+        ElectionResult.objects.filter(
+            district__code=20000, party__initials='CDU').update(votes=50)
+        data_stamp.checked = 0
+        self.assertEqual(svg_store.lookup(self.date, 10, 0), None)
+        response = self.client.get('/hc/svg/?date=2011-06-05&seats=10')
+        self.assertTrue(response.streaming)
+
+        # Rendered again for the new data
+        call_command('prerender_hemicycles', date=['2011-06-05'],
+                     seats=[10], stdout=StringIO())
+        self.assertTrue(svg_store.lookup(self.date, 10, 0))
+
+    def test_import(self):
+        """
+        The imports clear the store.
+        """
+        call_command('prerender_hemicycles', date=['2011-06-05'],
+                     seats=[10], stdout=StringIO())
+
+        with open(os.path.join(svg_store.root, 'results.csv'), 'wb') as f:
+            csv.writer(f).writerow(['10000', 'Aveiro', 'AR', '2015-10-04',
+                                    'PS', '100', '50.0', '1'])
+        stderr = StringIO()
+        call_command('import_election_results',
+                     results=os.path.join(svg_store.root, 'results.csv'),
+                     stats=os.devnull, stdout=StringIO(), stderr=stderr)
+        self.assertIn('prerender_hemicycles', stderr.getvalue())
+        self.assertEqual(svg_store.index, {})
+        self.assertEqual(svg_store.lookup(self.date, 10, 0), None)
+
+    def test_compressed(self):
+        url = '/hc/svg/?date=2011-06-05&seats=10'
+        live_svg = ''.join(self.client.get(url).streaming_content)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(
+            response.content)).read(), live_svg)
+        self.assertTrue(svg_cache.get(self.date, 10, 0))
+
+        # Compressed only once
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(cached.content, response.content)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(''.join(response.streaming_content
+                                 if response.streaming else
+                                 response.content), live_svg)
+
+
+class ConditionalGetTest(ElectionTestCase):
+    def test_not_modified(self):
+        for url in ('/hc/svg/?date=2011-06-05&seats=10',
+                    '/hc/?date=2011-06-05&seats=10'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('max-age', response['Cache-Control'])
+            etag = response['ETag']
+
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get(url + '&national_circle=1',
+                                       HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+    def test_data_change(self):
+        url = '/hc/svg/?date=2011-06-05&seats=10'
+        etag = self.client.get(url)['ETag']
+
+        result = ElectionResult.objects.get(district__code=20000,
+                                            party__initials='CDU')
+        result.votes = 50
+        result.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_other_process(self):
+        """
+        A change made without the signals, as by another process, changes
+        the ETags once the data stamp expires.
+        """
+        for url in ('/hc/svg/?date=2011-06-05&seats=10',
+                    '/hc/?date=2011-06-05&seats=10'):
+            etag = self.client.get(url)['ETag']
+
+            ElectionResult.objects.filter(
+                district__code=20000, party__initials='CDU').update(
+                votes=F('votes') + 1)
+            data_stamp.checked = 0
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_encoding(self):
+        url = '/hc/svg/?date=2011-06-05&seats=10'
+        self.assertNotEqual(
+            self.client.get(url)['ETag'],
+            self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')['ETag'])
+
+
+class SweepTest(ElectionTestCase):
+    def sweep(self, query):
+        response = self.client.get('/hc/sweep/?date=2011-06-05' + query)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_sweep(self):
+        data = self.sweep('&seats=20')
+        self.assertEqual(data['real_seats'], 7)
+        self.assertEqual(data['seats'], range(1, 21))
+        self.assertEqual([party['initials'] for party in data['parties']],
+                         ['PS', 'PSD', 'CDU'])
+
+        for seats in range(1, 21):
+            results, districts_seats = process_election_results(
+                self.date, seats, 0)
+            totals = self.totals(results)
+            for party in data['parties']:
+                self.assertEqual(party['seats'][seats - 1],
+                                 totals[party['initials']])
+
+    def test_method(self):
+        data = self.sweep('&seats=20&method=sainte-lague')
+        for seats in range(1, 21):
+            results, districts_seats = process_election_results(
+                self.date, seats, 0, method=SAINTE_LAGUE)
+            totals = self.totals(results)
+            for party in data['parties']:
+                self.assertEqual(party['seats'][seats - 1],
+                                 totals[party['initials']])
+
+        for method in ('hare', 'x'):
+            response = self.client.get(
+                '/hc/sweep/?date=2011-06-05&method=' + method)
+            self.assertEqual(response.status_code, 404)
+
+    def test_uni(self):
+        data = self.sweep('&seats=20&uni=U')
+        for seats in range(1, 21):
+            results, districts_seats = process_election_results(
+                self.date, seats, seats)
+            totals = self.totals(results)
+            for party in data['parties']:
+                self.assertEqual(party['seats'][seats - 1],
+                                 totals[party['initials']])
+
+    def test_not_found(self):
+        for query in ('?date=2011-06-06', '?date=x',
+                      '?date=2011-06-05&seats=0',
+                      '?date=2011-06-05&seats=1001'):
+            response = self.client.get('/hc/sweep/' + query)
+            self.assertEqual(response.status_code, 404)
+
+
+class ImportTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_csv(self, name, rows):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'wb') as csv_file:
+            csv.writer(csv_file).writerows(rows)
+        return path
+
+    def import_files(self, results, stats, **options):
+        call_command('import_election_results',
+                     results=self.write_csv('results.csv', results),
+                     stats=self.write_csv('stats.csv', stats),
+                     batch_size=2, stdout=StringIO(), **options)
+
+    def test_bundled(self):
+        call_command('import_election_results', stdout=StringIO())
+        self.assertEqual(ElectionResult.objects.count(), 3746)
+        self.assertEqual(ElectionStats.objects.count(), 333)
+        self.assertEqual(
+            ElectionResult.objects.filter(date=datetime.date(2011, 6, 5))
+            .aggregate(Sum('seats'))['seats__sum'], 230)
+        self.assertEqual(election_data.election_dates()[-1],
+                         datetime.date(2015, 10, 4))
+
+    def test_new_elections(self):
+        results = [['10000', 'Aveiro', 'AR', '2011-06-05', 'PS', '1000', '50', '3'],
+                   ['10000', 'Aveiro', 'AR', '2011-06-05', 'PPD/PSD', '800', '40', '2'],
+                   ['20000', 'Beja', 'AR', '2011-06-05', 'P.S.', '300', '60', '1']]
+        stats = [['10000', 'Aveiro', '2011-06-05', '2000', '1800', '0', '0'],
+                 ['20000', 'Beja', '2011-06-05', '500', '300', '0', '0']]
+        self.import_files(results, stats)
+        self.assertEqual(ElectionResult.objects.count(), 3)
+        self.assertEqual(ElectionStats.objects.count(), 2)
+        self.assertEqual(District.objects.get(code=10000).name, 'AVEIRO')
+        self.assertEqual(Party.objects.count(), 2)
+        self.assertEqual(
+            ElectionResult.objects.filter(party__initials='PS').count(), 2)
+
+        # The elections already imported are skipped
+        results.append(['10000', 'Aveiro', 'AR', '2015-10-04', 'PS', '900', '45', '2'])
+        stats.append(['10000', 'Aveiro', '2015-10-04', '2000', '1700', '0', '0'])
+        self.import_files(results, stats)
+        self.assertEqual(ElectionResult.objects.count(), 4)
+        self.assertEqual(ElectionStats.objects.count(), 3)
+        self.assertIn(datetime.date(2015, 10, 4), election_data)
+
+        # Or replaced
+        results[0][5] = '1100'
+        self.import_files(results[:1], stats[:1], update=True)
+        self.assertEqual(
+            ElectionResult.objects.filter(date=datetime.date(2011, 6, 5))
+            .get().votes, 1100)
+        self.assertEqual(ElectionResult.objects.count(), 2)
+
+    def test_incremental(self):
+        results = [['10000', 'Aveiro', 'AR', '2011-06-05', 'PS', '1000', '50', '3'],
+                   ['10000', 'Aveiro', 'AR', '2011-06-05', 'PSD', '800', '40', '2'],
+                   ['20000', 'Beja', 'AR', '2011-06-05', 'PS', '300', '60', '1'],
+                   ['10000', 'Aveiro', 'AR', '2015-10-04', 'PS', '900', '45', '2']]
+        stats = [['10000', 'Aveiro', '2011-06-05', '2000', '1800', '0', '0']]
+        self.import_files(results, stats, incremental=True)
+        self.assertEqual(ImportDigest.objects.count(), 3)
+        ids = dict((result.votes, result.pk)
+                   for result in ElectionResult.objects.all())
+
+        # The unchanged elections are skipped
+        output = StringIO()
+        call_command('import_election_results',
+                     results=self.write_csv('results.csv', results),
+                     stats=self.write_csv('stats.csv', stats),
+                     incremental=True, stdout=output)
+        self.assertIn('0 results and 0 stats imported', output.getvalue())
+
+        # Only the changed, new and removed rows are written
+        results[1][5] = '850'
+        results[2] = ['20000', 'Beja', 'AR', '2011-06-05', 'PSD', '200', '40', '1']
+        results.append(['20000', 'Beja', 'AR', '2015-10-04', 'PS', '100', '45', '1'])
+        output = StringIO()
+        call_command('import_election_results',
+                     results=self.write_csv('results.csv', results),
+                     stats=self.write_csv('stats.csv', stats),
+                     incremental=True, stdout=output)
+        self.assertIn('4 results and 0 stats imported', output.getvalue())
+
+        votes = dict(((result.district.code, result.party.initials,
+                       result.date.year), result.votes)
+                     for result in ElectionResult.objects.all())
+        self.assertEqual(votes, {(10000, 'PS', 2011): 1000,
+                                 (10000, 'PSD', 2011): 850,
+                                 (20000, 'PSD', 2011): 200,
+                                 (10000, 'PS', 2015): 900,
+                                 (20000, 'PS', 2015): 100})
+        self.assertEqual(ElectionResult.objects.get(votes=1000).pk, ids[1000])
+        self.assertEqual(ElectionResult.objects.get(votes=850).pk, ids[800])
+
+    @skipUnlessDBFeature('can_rollback_ddl')
+    def test_no_digest_table(self):
+        '''
+        Without the ImportDigest table the elections are still imported,
+        but --incremental can't be used.
+        '''
+        with connection.schema_editor() as editor:
+            editor.delete_model(ImportDigest)
+
+        results = [['10000', 'Aveiro', 'AR', '2011-06-05', 'PS', '1000', '50', '3']]
+        stats = [['10000', 'Aveiro', '2011-06-05', '2000', '1800', '0', '0']]
+        with self.assertRaisesRegexp(CommandError, '--run-syncdb'):
+            self.import_files(results, stats, incremental=True)
+        self.assertEqual(ElectionResult.objects.count(), 0)
+
+        self.import_files(results, stats)
+        self.assertEqual(ElectionResult.objects.count(), 1)
+
+    def test_unknown_party(self):
+        with self.assertRaises(CommandError):
+            self.import_files(
+                [['10000', 'Aveiro', 'AR', '2011-06-05', 'XYZ', '1', '0', '0']],
+                [])
+        self.assertEqual(District.objects.count(), 0)
+
+
+class HemicycleTest(TestCase):
+    def test_solve_b(self):
+        for nchairs, nrows in ((10, 1), (50, 3), (230, 8), (1000, 16)):
+            hc = Hemicycle(chair_width=60, chair_height=60, nchairs=nchairs,
+                           nrows=nrows, hangle=pi)
+            self.assertEqual(hc.calc_chairs(hc.inner_radius), nchairs)
+            self.assertEqual(sum(row['nchairs'] for row in hc.rows()),
+                             nchairs)
+
+    def test_geometry_table(self):
+        for nchairs in (10, 41, 230, 601, 1000):
+            hc = Hemicycle(chair_width=60, chair_height=60, nchairs=nchairs,
+                           nrows=hemicycle_rows(nchairs), hangle=pi)
+            b, chairs = GEOMETRY.lookup(hc)
+            self.assertEqual(b, hc.search_b())
+            self.assertEqual(sum(chairs), nchairs)
+
+
+def reference_chair_dist(hc, parties):
+    '''
+    HemicycleSGV.chair_dist as it was before it was rewritten to avoid the
+    quadratic sums. Returns the chair matrix and the final party order.
+    '''
+    def smallest(parties, first_row):
+        remaining = (sum([party['result'] for party in parties]) -
+                     sum([sum(party['seats']) for party in parties]))
+
+        smallest_party = parties[0]
+
+        dist_seats = sum(smallest_party['seats'])
+        remaining_seats = smallest_party['result'] - dist_seats
+
+        percent = float(remaining_seats) / remaining
+        nc = int(floor(percent * first_row))
+
+        if sum(smallest_party['seats']) == smallest_party['result']:
+            return 0
+
+        return 1 if not nc else nc
+
+    def fill_row(parties, seats):
+        parties.sort(key=lambda party: party['result'])
+
+        for i in range(len(parties)):
+            party = parties[i]
+
+            party_row_seats = smallest(parties[i:], seats)
+            party['seats'].append(party_row_seats)
+            seats -= party_row_seats
+
+    for party in parties:
+        party['seats'] = []
+
+    for row in [row['nchairs'] for row in hc.rows()]:
+        fill_row(parties, row)
+        parties.sort(key=lambda party: party['order'])
+
+    chairs = []
+    for i in range(hc.nrows):
+        row = []
+        for j in range(len(parties)):
+            for seat in range(parties[j]['seats'][i]):
+                row.append(j)
+        chairs.append(row)
+
+    return chairs, [party['initials'] for party in parties]
+
+
+class ChairDistTest(TestCase):
+    def elections(self):
+        '''
+        Real results and single circle simulations for every election on
+        the bundled data.
+        '''
+        data = os.path.join(os.path.dirname(__file__), 'static', 'data',
+                            'resultados_legislativas-1975-2011.csv')
+        elections = {}
+        for row in csv.reader(open(data)):
+            party = elections.setdefault(row[3], {}).setdefault(
+                row[4], {'initials': row[4], 'votes': 0, 'result': 0})
+            party['votes'] += int(row[5])
+            party['result'] += int(row[7])
+
+        for date in sorted(elections):
+            parties = elections[date].values()
+            for order, party in enumerate(sorted(parties,
+                                                 key=lambda p: p['initials'])):
+                party['order'] = order
+            yield date, sum(party['result'] for party in parties), parties
+
+            for seats in (10, 100, 500, 1000):
+                parties = hondt_method(seats, [dict(party)
+                                               for party in parties])
+                yield date, seats, parties
+
+    def assertSameDist(self, seats, parties):
+        hc = Hemicycle(chair_width=60, chair_height=60, nchairs=seats,
+                       nrows=hemicycle_rows(seats), hangle=pi)
+
+        expected = reference_chair_dist(hc, [dict(party)
+                                             for party in parties])
+        hc_svg = HemicycleSGV(hc, [dict(party) for party in parties])
+        hc_svg.chair_dist()
+        self.assertEqual(
+            (hc_svg.chairs, [party['initials'] for party in hc_svg.parties]),
+            expected)
+
+    def test_elections(self):
+        for date, seats, parties in self.elections():
+            self.assertSameDist(seats, parties)
+
+    def test_ties(self):
+        parties = [{'initials': initials, 'result': result, 'order': order}
+                   for initials, result, order in (('A', 20, 3), ('B', 5, 1),
+                                                   ('C', 20, 1), ('D', 5, 0),
+                                                   ('E', 50, 2))]
+        self.assertSameDist(100, parties)
+
+
+class ChairRenderTest(TestCase):
+    def test_format_number(self):
+        for value, precision, number in ((1.5, 6, '1.5'), (180.0, 6, '180'),
+                                         (-90.0, 6, '-90'), (0.0004, 3, '0'),
+                                         (-0.0004, 3, '0'), (10.004, 2, '10'),
+                                         (-0.1256, 3, '-0.126'),
+                                         (1e-7, 6, '0'), (120, 0, '120')):
+            self.assertEqual(format_number(value, precision), number)
+
+    def test_chair_xml(self):
+        '''
+        Each chair is rotated by 90 - angle degrees and moved to its place
+        on the hemicycle, half a chair from the location.
+        '''
+        hc = Hemicycle(chair_width=60, chair_height=60, nchairs=230,
+                       nrows=8, hangle=pi)
+        hc_svg = HemicycleSGV(hc, [{'initials': 'PS', 'result': 230,
+                                    'order': 0}])
+        width, height = hc_svg.svg_dimention()
+
+        for locations in hc.chair_locations():
+            for location in locations:
+                angle, x, y = location
+                expected = (x + width / 2 - 30 * cos(pi / 2 - angle),
+                            height - y - 30 * sin(pi / 2 - angle) - 50,
+                            90 - degrees(angle))
+
+                xml = hc_svg.chair_xml(location, '#PS', width, height)
+                self.assertIn('xlink:href="#PS"', xml)
+                values = re.search(
+                    r'translate\(([^,]*),([^)]*)\) rotate\(([^)]*)\)',
+                    xml).groups()
+                for value, expected_value in zip(values, expected):
+                    self.assertAlmostEqual(float(value), expected_value, 5)
+
+    def test_compact(self):
+        '''
+        The compact document has the same chairs, with short ids, rounded
+        coordinates and no whitespace between tags.
+        '''
+        def render(compact, precision):
+            hc = Hemicycle(chair_width=60, chair_height=60, nchairs=230,
+                           nrows=8, hangle=pi)
+            hc_svg = HemicycleSGV(hc, [
+                {'initials': 'PS', 'result': 120, 'order': 0,
+                 'color_1': 'pink', 'color_2': 'pink'},
+                {'initials': 'PSD', 'result': 110, 'order': 1,
+                 'color_1': 'orange', 'color_2': 'orange'}],
+                compact=compact, precision=precision)
+            hc_svg.chair_dist()
+            return hc_svg.svg()
+
+        default = render(False, 6)
+        compact = render(True, 2)
+
+        self.assertLess(len(compact), len(default))
+        self.assertNotIn('\n', compact)
+        self.assertNotIn(' >', compact)
+        self.assertIn('id="p1"', compact)
+        self.assertIn('id="g1"', compact)
+        self.assertIn('id="PSD_group"', default)
+        self.assertEqual(compact.count('xlink:href="#p1"'),
+                         default.count('xlink:href="#PSD"'))
+
+        transform = r'translate\(([^,]*),([^)]*)\) rotate\(([^)]*)\)'
+        for default_values, compact_values in zip(
+                re.findall(transform, default),
+                re.findall(transform, compact)):
+            for value, compact_value in zip(default_values, compact_values):
+                self.assertLessEqual(len(compact_value.partition('.')[2]), 2)
+                self.assertFalse(compact_value.endswith('0') and
+                                 '.' in compact_value)
+                self.assertAlmostEqual(float(value), float(compact_value),
+                                       delta=0.006)
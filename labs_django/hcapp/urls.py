@@ -14,6 +14,9 @@ urlpatterns = [
     # Show election results
     url(r'^$', views.results, name='hc_results'),
 
+    # Seats of each party for every number of seats, JSON
+    url(r'^sweep/$', views.seat_sweep, name='hc_sweep'),
+
     ##
     # Static pages
 
@@ -2,86 +2,131 @@
 
 # Global imports
 import datetime
+import hashlib
 
 from math import pi
 
+from django.conf import settings
 from django.core.urlresolvers import reverse
-from django.db.models import Sum, Count, Max, Min
-from django.http import HttpResponse, HttpResponseRedirect, Http404
+from django.http import (HttpResponse, HttpResponseRedirect, JsonResponse,
+                         StreamingHttpResponse, Http404)
 from django.shortcuts import render_to_response
 from django.template import RequestContext
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 
 # Local imports
-from hcapp.models import Party, District, ElectionResult, ElectionStats
-from hc.pm import hondt_method
-from hc.chairs import Hemicycle
+from hcapp.cache import (allocation_cache, district_cache, svg_cache,
+                         data_stamp, election_data)
+from hcapp.records import PartyResult
+from hcapp.svgstore import svg_store, choose_encoding, compress_svg
+from hc.pm import (DHONDT, DIVISORS, METHODS, apportionment_method,
+                   apportionment_matrix, apportionment_sweep, hondt_sweep)
+from hc.chairs import Hemicycle, hemicycle_rows
 from hc.draw import HemicycleSGV
 from hcapp.forms import ElectionForm
 
 ##
 # Config
 
-LAST_ELECTION = ElectionResult.objects.all().aggregate(Max('date'))['date__max'].isoformat()
 MAX_GRAPHWIDTH = 150
 
+# Hemicycle SVG output, compact documents with coordinates rounded to
+# SVG_PRECISION decimal places
+SVG_COMPACT = getattr(settings, 'HC_SVG_COMPACT', True)
+SVG_PRECISION = getattr(settings, 'HC_SVG_PRECISION', 3)
+
+# Browser and proxy cache lifetime of the hemicycle views, in seconds
+CACHE_MAX_AGE = getattr(settings, 'HC_CACHE_MAX_AGE', 7 * 24 * 3600)
+
 ##
 # Utils
 
+def last_election():
+    '''Date of the last election (YYYY-MM-DD), '' if there's none'''
+    dates = election_data.election_dates()
+    return dates[-1].isoformat() if dates else ''
+
+
+def request_date(request):
+    '''The date parameter, the last election by default'''
+    if 'date' in request.GET:
+        return request.GET['date']
+    return last_election()
+
+
+def request_apportionment(request):
+    '''The apportionment method parameter, D'Hondt by default'''
+    method = request.GET.get('method', DHONDT)
+    if method not in METHODS:
+        raise Http404
+    return method
+
+
+def request_etag(request, *extra):
+    '''
+    ETag of a view response, derived from the request path and parameters,
+    the election data stamp and anything else in extra the response
+    depends on. No query is made once the data stamp is known.
+    '''
+    key = (request.path, sorted(request.GET.lists()), data_stamp.get()) + extra
+    return hashlib.sha1(repr(key)).hexdigest()
+
+
+def svg_etag(request):
+    return request_etag(request, choose_encoding(request), SVG_COMPACT,
+                        SVG_PRECISION)
+
+
+def results_etag(request):
+    return request_etag(request)
+
 
 ##
 # Vote processing
 
-def get_uni_votes(results):
+def get_uni_votes(snapshot):
     result_uni = {}
-    for result in results:
-        initials = result.party.initials
+    for code, party_id, votes, seats in snapshot.rows:
+        party = snapshot.parties[party_id]
+        initials = party.initials
         if not result_uni.has_key(initials):
-            result_uni[initials] = {
-                'party': result.party,
-                'initials': initials,
-                'votes':    0
-            }
-        result_uni[initials]['votes'] += result.votes
+            result_uni[initials] = PartyResult(party)
+        result_uni[initials].votes += votes
 
     return {1: [result_uni[r] for r in result_uni]}
 
 
-def get_district_votes(results):
+def get_district_votes(snapshot):
     results_district = {}
-    for result in results:
-        code = result.district.code
+    for code, party_id, votes, seats in snapshot.rows:
+        party = snapshot.parties[party_id]
         if not results_district.has_key(code):
             results_district[code] = []
 
-        results_district[code].append({
-            'party':    result.party,
-            'initials': result.party.initials,
-            'votes':    result.votes
-        })
+        results_district[code].append(PartyResult(party, votes))
     return results_district
 
 
-def get_election_results(date, uni_district):
-    # Get the election results
-    results = ElectionResult.objects.filter(date__exact=date).select_related('party', 'district')
-
+def get_election_results(snapshot, uni_district):
     # Parties running for the election:
-    parties = [Xi['party__initials']
-               for Xi in results.values('party__initials').distinct()]
-
-    # Seats:
-    total_seats = results.aggregate(Sum('seats'))['seats__sum']
+    parties = []
+    for code, party_id, votes, seats in snapshot.rows:
+        initials = snapshot.parties[party_id].initials
+        if initials not in parties:
+            parties.append(initials)
 
     # Prepare the results
     if uni_district:
-        results_dict = get_uni_votes(results)
+        results_dict = get_uni_votes(snapshot)
     else:
-        results_dict = get_district_votes(results)
+        results_dict = get_district_votes(snapshot)
 
-    return results_dict, total_seats, parties
+    return results_dict, snapshot.total_seats, parties
 
 
-def get_district_seats(date, seats, total_seats, national_circle):
+def get_district_seats(snapshot, seats, national_circle):
     '''
     If the number of 'seats' for which we want to define the hemicycle
     is different from the number of seats the actual elections where made
@@ -95,28 +140,21 @@ def get_district_seats(date, seats, total_seats, national_circle):
     if national_circle == seats:
         return {1: {'code': 1, 'result': seats}}
 
-    if seats != total_seats:
-        # Need to redistribute the PMs by each district:
-        stats = ElectionStats.objects.filter(date__exact=date)
-        # Get the registred voters for each district
-        demographics = []
-        for stat in stats:
-            demographics.append({
-                'code': stat.district.code,
-                'votes': stat.registered_voters})
-
-        # Recalculate seat attribution by electoral district
-        districts_seats = hondt_method(seats, demographics)
+    if seats != snapshot.total_seats:
+        # Need to redistribute the PMs by each district, by the registred
+        # voters of each district, see ElectionSnapshot
+        districts_seats = []
+        for code, district_seats in snapshot.district_apportionment(seats):
+            districts_seats.append({'code': code,
+                                    'result': district_seats})
 
     else:
-        # Just retrieve the number of seats from the database
+        # Just use the number of seats of each district
         districts_seats = []
-        for district in District.objects.all():
-            code = district.code
-            seats = district.electionresult_set.filter(
-                date__exact=date).aggregate(seats=Sum('seats'))['seats']
-            if seats:
-                districts_seats.append({'code': code, 'result': seats})
+        for code, district_seats in snapshot.district_seats.items():
+            if district_seats:
+                districts_seats.append({'code': code,
+                                        'result': district_seats})
 
     district_dict = {}
     for district in districts_seats:
@@ -125,11 +163,17 @@ def get_district_seats(date, seats, total_seats, national_circle):
     return district_dict
 
 
-def get_country_results(results, districts_seats):
-    # Get the results for each district
-    for district in results:
-        seats = districts_seats[district]['result']
-        results[district] = hondt_method(seats, results[district])
+def get_country_results(results, districts_seats, method=DHONDT):
+    # Get the results for all the districts at once
+    districts = results.keys()
+    seats = [districts_seats[district]['result'] for district in districts]
+    votes = [[party.votes for party in results[district]]
+             for district in districts]
+
+    for district, district_result in zip(
+            districts, apportionment_matrix(votes, seats, method)):
+        for party, result in zip(results[district], district_result):
+            party.result = result
 
 
 def get_totals(results):
@@ -137,17 +181,12 @@ def get_totals(results):
     totals_tmp = {}
     for district in results:
         for party in results[district]:
-            initials = party['initials']
+            initials = party.initials
             if not totals_tmp.has_key(initials):
-                totals_tmp[initials] = {
-                    'initials': initials,
-                    'party': party['party'],
-                    'result': 0,
-                    'votes': 0
-                }
-            totals_tmp[initials]['result'] += party['result']
+                totals_tmp[initials] = PartyResult(party.party)
+            totals_tmp[initials].result += party.result
             if district != 'national_circle':
-                totals_tmp[initials]['votes'] += party['votes']
+                totals_tmp[initials].votes += party.votes
     results['total'] = [totals_tmp[r] for r in totals_tmp]
 
 
@@ -155,46 +194,74 @@ def get_national_circle_votes(national_circle_result, results):
     nc = {}
     for district in results:
         for party_votes in results[district]:
-            if not party_votes['result'] and party_votes['votes']:
-                if party_votes['initials'] not in nc:
-                    nc[party_votes['initials']] = {
-                        'party': party_votes['party'],
-                        'votes': party_votes['votes'],
-                        'result': 0,
-                        'initials': party_votes['initials'],
-                    }
+            if not party_votes.result and party_votes.votes:
+                if party_votes.initials not in nc:
+                    nc[party_votes.initials] = PartyResult(
+                        party_votes.party, party_votes.votes)
                 else:
-                    nc[party_votes['initials']]['votes'] += party_votes['votes']
+                    nc[party_votes.initials].votes += party_votes.votes
 
     for party in nc:
         national_circle_result.append(nc[party])
 
 
-def process_election_results(date, seats, national_circle):
+def copy_results(results, districts_seats):
+    '''
+    The views change the totals, so they must get their own copy of the
+    cached results. The party records of the districts are left shared.
+    '''
+    results = dict(results)
+    results['total'] = [party.copy() for party in results['total']]
+    districts_seats = dict((code, dict(districts_seats[code]))
+                           for code in districts_seats)
+    return results, districts_seats
+
+
+def process_election_results(date, seats, national_circle, snapshot=None,
+                             method=DHONDT):
     '''
     year, month, day - date of the election to analyze
     seats - number of total seats to consider
+    snapshot - the election ElectionSnapshot, from election_data by default
+    method - apportionment method, one of hc.pm.METHODS
+
+    The allocations are cached, see hcapp.cache.
+    '''
+    allocation = allocation_cache.get(date, seats, national_circle, method)
+    if allocation is None:
+        allocation = calc_election_results(date, seats, national_circle,
+                                           snapshot, method)
+        allocation_cache.set(date, seats, national_circle, allocation,
+                             method)
+
+    return copy_results(*allocation)
+
+
+def calc_election_results(date, seats, national_circle, snapshot=None,
+                          method=DHONDT):
+    '''
+    Computes the seat allocation returned by process_election_results.
+
+    The district allocation depends only on the seats left to the
+    districts, it's taken from district_election_results. Only the
+    national circle, an apportionment over the unused votes of each party,
+    is computed here.
     '''
     uni_district = seats == national_circle
-    if national_circle > 0 and national_circle < seats:
+    if not uni_district:
         seats = seats - national_circle
 
-    # Get the raw results:
-    results, total_seats, parties = get_election_results(date, uni_district)
-
-    # Get the seat distribution per electoral district
-    districts_seats = get_district_seats(date, seats, total_seats, national_circle)
+    results, districts_seats, unused_votes = district_election_results(
+        date, seats, uni_district, snapshot, method)
 
-    # Get country results
-    get_country_results(results, districts_seats)
+    # The district results are shared with the district cache
+    results = dict(results)
 
     # Get the results for the national circle
-    if national_circle > 0 and national_circle != seats:
-        # Get the "non used votes" for each district for each party
-        national_circle_result = []
-        get_national_circle_votes(national_circle_result, results)
-        # Calculate the seats dist
-        results['national_circle'] = hondt_method(national_circle, national_circle_result)
+    if national_circle > 0 and not uni_district:
+        results['national_circle'] = apportionment_method(
+            national_circle, [party.copy() for party in unused_votes],
+            method)
 
     # Make the total sum
     get_totals(results)
@@ -202,19 +269,138 @@ def process_election_results(date, seats, national_circle):
     return results, districts_seats
 
 
+def district_election_results(date, seats, uni_district, snapshot=None,
+                              method=DHONDT):
+    '''
+    seats - number of seats of the electoral districts, without the
+        national circle
+    uni_district - a single electoral circle with all the seats
+    method - apportionment method of the seats of each district
+
+    Seat allocation of each electoral district and the unused votes of
+    each party, as used by the national circle. These are the same for
+    every national circle size that leaves seats to the districts, so
+    they're cached apart from the full allocations: district_cache is
+    keyed by the allocation without national circle, (date, seats, 0), or
+    by (date, seats, seats) for a single electoral circle.
+    '''
+    national_circle = seats if uni_district else 0
+
+    district_results = district_cache.get(date, seats, national_circle,
+                                          method)
+    if district_results is None:
+        if snapshot is None:
+            snapshot = election_data.get(date)
+
+        # Get the raw results:
+        results, total_seats, parties = get_election_results(snapshot,
+                                                             uni_district)
+
+        # Get the seat distribution per electoral district
+        districts_seats = get_district_seats(snapshot, seats,
+                                             national_circle)
+
+        # Get country results
+        get_country_results(results, districts_seats, method)
+
+        # Get the "non used votes" for each district for each party
+        unused_votes = []
+        get_national_circle_votes(unused_votes, results)
+
+        district_results = results, districts_seats, unused_votes
+        district_cache.set(date, seats, national_circle, district_results,
+                           method)
+
+    return district_results
+
+
+def sweep_election_results(snapshot, seats, uni_district, method=DHONDT):
+    '''
+    Seats of each party for every number of seats from 1 to seats, without
+    national circle. Returns a dict with a list for each party initials,
+    item n - 1 is the party result for n seats. method must be one of the
+    divisor methods, on hc.pm.DIVISORS.
+
+    The seats are distributed by the districts as get_district_seats does
+    for other than the real number of seats, the results for the real
+    number of seats must be taken from process_election_results.
+    '''
+    results, total_seats, parties = get_election_results(snapshot,
+                                                         uni_district)
+
+    # District that gets each seat
+    if uni_district:
+        codes = [1]
+        district_winners = [0] * seats
+    else:
+        codes = [code for code, voters in snapshot.registered_voters()]
+        district_winners = hondt_sweep(
+            seats, [voters for code, voters in snapshot.registered_voters()])
+
+    # Party that gets each seat of each district
+    party_winners = {}
+    for i, code in enumerate(codes):
+        if code in results:
+            party_winners[code] = iter(apportionment_sweep(
+                district_winners.count(i),
+                [party.votes for party in results[code]], method))
+
+    totals = dict((initials, 0) for initials in parties)
+    curves = dict((initials, []) for initials in parties)
+    for i in district_winners:
+        code = codes[i]
+        if code in party_winners:
+            totals[results[code][next(party_winners[code])].initials] += 1
+        for initials in parties:
+            curves[initials].append(totals[initials])
+
+    return curves
+
+
+##
+# Hemicycle
+
+def render_hemicycle(date, seats, national_circle, method=DHONDT):
+    '''
+    Returns the hemicycle SVG for the election on date, in chunks.
+    '''
+    # Process the results
+    results, districts_seats = process_election_results(
+        date, seats, national_circle, method=method)
+
+    # Create the hemicycle
+    hc = Hemicycle(chair_width=60,
+                   chair_height=60,
+                   nchairs=seats,
+                   nrows=hemicycle_rows(seats),
+                   hangle=pi)
+
+    # Graphical representation of the hemicycle, HemicycleSGV takes the
+    # party records as party dicts
+    hc_svg = HemicycleSGV(hc, results['total'], compact=SVG_COMPACT,
+                          precision=SVG_PRECISION)
+    hc_svg.chair_dist()
+
+    return hc_svg.iter_svg()
+
+
 ##
 # Views
 
+@cache_control(public=True, max_age=CACHE_MAX_AGE)
+@vary_on_headers('Accept-Encoding')
+@condition(etag_func=svg_etag)
 def svg_hemicycle(request):
 
     # Get the parameters
     try:
-        date = datetime.datetime.strptime(request.GET.get('date', LAST_ELECTION), '%Y-%m-%d').date()
+        date = datetime.datetime.strptime(request_date(request), '%Y-%m-%d').date()
         seats = int(request.GET.get('seats', 0))
         national_circle = int(request.GET.get('national_circle', 0))
         attachment = request.GET.get('attachment', 'no')
     except ValueError:
         raise Http404
+    method = request_apportionment(request)
 
     try:
         uni = request.GET.get('uni', 'M')
@@ -226,14 +412,12 @@ def svg_hemicycle(request):
 
     # Argument testing
 
-    election_results = ElectionResult.objects.filter(
-        date__exact=date).aggregate(Count('date'))['date__count']
-    if election_results == 0:
+    snapshot = election_data.get(date)
+    if snapshot is None:
         raise Http404
 
     if seats == 0:
-        seats = ElectionResult.objects.filter(
-            date__exact=date).aggregate(Sum('seats'))['seats__sum']
+        seats = snapshot.total_seats
     if seats < 10 or seats > 1000:
         raise Http404
     if national_circle < 0 or national_circle > seats:
@@ -243,41 +427,40 @@ def svg_hemicycle(request):
     uni_str = ('circulo_unico' if national_circle == seats else
                'varios_circulos' if national_circle == 0 else
                'varios_circulos_mais_circulo_nacional_%d' % national_circle)
-
-    # Process the results
-    results, districts_seats = process_election_results(date, seats, national_circle)
-
-    # Format the Hemicycle data
-    parties = results['total']
-    for party in parties:
-        p = party['party']
-        party['order'] = p.order
-        party['color_1'] = p.color_1
-        party['color_2'] = p.color_2
-
-    # Create the hemicycle
-    nrows = (16 if seats > 600 else
-             8 if 200 < seats <= 600 else
-             6 if 80 < seats <= 200 else
-             3 if 40 < seats <= 80 else 1)
-
-    hc = Hemicycle(chair_width=60,
-                   chair_height=60,
-                   nchairs=seats,
-                   nrows=nrows,
-                   hangle=pi)
-
-    # Graphical representation of the hemicycle
-    hc_svg = HemicycleSGV(hc, parties)
-    hc_svg.chair_dist()
-
-    response = HttpResponse(hc_svg.svg(), content_type='image/svg+xml')
+    if method != DHONDT:
+        uni_str += '-%s' % method
+
+    # Use the pre-rendered SVG if there is one, else the compressed live
+    # render. The SVG is only streamed to clients without compression. Only
+    # the D'Hondt hemicycles are pre-rendered.
+    encoding = choose_encoding(request)
+    svg_file = (svg_store.lookup(date, seats, national_circle)
+                if method == DHONDT else None)
+    if svg_file:
+        response = svg_store.response(svg_file, encoding)
+    else:
+        variants = svg_cache.get(date, seats, national_circle, method)
+        if variants is None and encoding is None:
+            response = StreamingHttpResponse(
+                render_hemicycle(date, seats, national_circle, method),
+                content_type='image/svg+xml')
+        else:
+            if variants is None:
+                variants = compress_svg(''.join(
+                    render_hemicycle(date, seats, national_circle, method)))
+                svg_cache.set(date, seats, national_circle, variants, method)
+            response = HttpResponse(variants[encoding or 'identity'],
+                                    content_type='image/svg+xml')
+            if encoding:
+                response['Content-Encoding'] = encoding
     response['Content-Disposition'] = '%sfilename="%s-eleicoes-%d_deputados-%s.svg"' % (
         attachment, date.isoformat(), seats, uni_str)
 
     return response
 
 
+@cache_control(public=True, max_age=CACHE_MAX_AGE)
+@condition(etag_func=results_etag)
 def results(request):
 
     # Get the parameters
@@ -286,7 +469,7 @@ def results(request):
     except ValueError:
         seats = 0
     try:
-        date = datetime.datetime.strptime(request.GET.get('date', LAST_ELECTION), '%Y-%m-%d').date()
+        date = datetime.datetime.strptime(request_date(request), '%Y-%m-%d').date()
     except ValueError:
         raise Http404
     try:
@@ -300,16 +483,15 @@ def results(request):
             national_circle = seats
     except ValueError:
         pass
+    method = request_apportionment(request)
 
     # Parameter testing
-    election_results = ElectionResult.objects.filter(
-        date__exact=date).aggregate(Count('date'))['date__count']
-    if election_results == 0:
+    snapshot = election_data.get(date)
+    if snapshot is None:
         raise Http404
 
     if seats == 0:
-        seats = ElectionResult.objects.filter(
-            date__exact=date).aggregate(Sum('seats'))['seats__sum']
+        seats = snapshot.total_seats
     if seats < 10:
         seats = 10
     elif seats > 1000:
@@ -321,31 +503,29 @@ def results(request):
         national_circle = seats
 
     # Process the results
-    results, districts_seats = process_election_results(date, seats, national_circle)
+    results, districts_seats = process_election_results(
+        date, seats, national_circle, snapshot, method)
 
     # Format the Hemicycle data
-    votes = ElectionResult.objects.filter(date__exact=date).aggregate(Sum('votes'))['votes__sum']
+    votes = snapshot.votes
     parties = results['total']
-    parties.sort(key=lambda party: -party['votes'])
-    max_seats = parties[0]['result']
+    parties.sort(key=lambda party: -party.votes)
+    max_seats = parties[0].result
     for party in parties:
-        p = party['party']
-        party['order'] = p.order
-        party['color_1'] = p.color_1
-        party['color_2'] = p.color_2
-        party['percentage'] = float(party['votes']) / votes * 100
-        party['percentage_seats'] = float(party['result']) / seats * 100
-        party['graph'] = party['result'] * MAX_GRAPHWIDTH / max_seats
+        party.percentage = float(party.votes) / votes * 100
+        party.percentage_seats = float(party.result) / seats * 100
+        party.graph = party.result * MAX_GRAPHWIDTH / max_seats
 
     # Next and previous elections
-    next_date = ElectionResult.objects.filter(date__gt=date).aggregate(Min('date'))['date__min']
-    prev_date = ElectionResult.objects.filter(date__lt=date).aggregate(Max('date'))['date__max']
+    next_date = election_data.next(date)
+    prev_date = election_data.previous(date)
 
     # Form
 
     form = ElectionForm({'date': date.isoformat(),
                          'national_circle': national_circle,
-                         'seats': seats})
+                         'seats': seats,
+                         'method': method})
 
     # Context
     context = {}
@@ -354,8 +534,9 @@ def results(request):
     context['prev_date'] = prev_date
     context['seats'] = seats
     context['national_circle'] = national_circle
-    context['real_seats'] = ElectionResult.objects.filter(
-        date__exact=date).aggregate(Sum('seats'))['seats__sum']
+    context['method'] = method
+    context['method_query'] = '' if method == DHONDT else '&method=%s' % method
+    context['real_seats'] = snapshot.total_seats
     context['votes'] = votes
     context['results'] = results
     context['districts_seats'] = districts_seats
@@ -365,6 +546,61 @@ def results(request):
                               context_instance=RequestContext(request))
 
 
+@cache_control(public=True, max_age=CACHE_MAX_AGE)
+@condition(etag_func=results_etag)
+def seat_sweep(request):
+    '''
+    JSON with the seats of each party for every number of seats from 1 to
+    the seats parameter (1000 by default), to follow the seats slider
+    without a request for each value. Only without national circle or with
+    a single electoral circle (uni=U), and for the divisor methods.
+    '''
+    try:
+        date = datetime.datetime.strptime(request_date(request), '%Y-%m-%d').date()
+        seats = int(request.GET.get('seats', 1000))
+    except ValueError:
+        raise Http404
+    uni_district = request.GET.get('uni', 'M') == 'U'
+    method = request_apportionment(request)
+    if method not in DIVISORS:
+        raise Http404
+
+    snapshot = election_data.get(date)
+    if snapshot is None or seats < 1 or seats > 1000:
+        raise Http404
+
+    curves = sweep_election_results(snapshot, seats, uni_district, method)
+
+    # The real results use the real seats of each district
+    real_seats = snapshot.total_seats
+    if not uni_district and real_seats <= seats:
+        results, districts_seats = process_election_results(
+            date, real_seats, 0, snapshot, method)
+        for party in results['total']:
+            curves[party.initials][real_seats - 1] = party.result
+
+    parties = []
+    for party in sorted(snapshot.parties.values(), key=lambda p: p.order):
+        if party.initials not in curves:
+            continue
+        parties.append({
+            'initials': party.initials,
+            'name': party.name,
+            'order': party.order,
+            'color_1': party.color_1,
+            'color_2': party.color_2,
+            'seats': curves[party.initials],
+        })
+
+    return JsonResponse({
+        'date': date.isoformat(),
+        'uni': uni_district,
+        'real_seats': real_seats,
+        'seats': range(1, seats + 1),
+        'parties': parties,
+    })
+
+
 def election_results(request):
     # Redirect to the latest election on file
     return HttpResponseRedirect(reverse('results'))
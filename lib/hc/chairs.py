@@ -10,6 +10,9 @@ distribution in an hemicycle.
 ##
 
 from math import asin, pi, floor, cos, sin
+import mmap
+import os.path
+import struct
 
 ##
 # Constantes
@@ -17,6 +20,20 @@ from math import asin, pi, floor, cos, sin
 
 MAXCYCLE = 10000
 
+# Inner radius of the already solved hemicycles, by
+# (chair_width, chair_height, nchairs, nrows, hangle)
+SOLUTIONS = {}
+
+# Geometry table, see GeometryTable
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'hemicycles.dat')
+TABLE_MAGIC = 'HCGT'
+TABLE_FIRST = 10
+TABLE_LAST = 1000
+MAXROWS = 16
+TABLE_HEADER = struct.Struct('<4sdddHH')
+TABLE_RECORD = struct.Struct('<Bd%dH' % MAXROWS)
+
 ##
 # Exception
 ##
@@ -46,6 +63,7 @@ class Hemicycle(object):
         self.N = 230
 
         self.b = None
+        self.row_table = None
 
     def width(self):
         '''Hemicycle width'''
@@ -86,27 +104,76 @@ class Hemicycle(object):
         '''
         return self.hangle / self.chairs_per_row(row)
 
+    def calc_chairs(self, b):
+        '''
+        For a given b, calculates the number of possible chairs on the
+        hemicycle. Being b the distance from the centre to the first
+        row of chairs.
+        '''
+        N = 0
+        for row in range(self.nrows):
+            b_tmp = b + self.chair_height * row
+            N += self.chairs_per_row(b_tmp)
+        return floor(N)
+
+    def first_step(self, b, step, target):
+        '''
+        Returns the first n, 0 < n < MAXCYCLE, for which b + n * step has at
+        least target chairs (or MAXCYCLE - 1 if there's none). The chair
+        count grows with b, so the steps are bracketed doubling n and then
+        bisected, O(log(n)) chair counts instead of n.
+        '''
+        last = MAXCYCLE - 1
+
+        lo, hi = 0, 1
+        while hi < last and self.calc_chairs(b + step * hi) < target:
+            lo, hi = hi, min(2 * hi, last)
+
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.calc_chairs(b + step * mid) < target:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
     def solve_b(self):
         if self.b:
             return self.b
 
-        def calc_chairs(b):
-            '''
-            For a given b, calculates the number of possible chairs on the
-            hemicycle. Being b the distance from the centre to the first
-            row of chairs.
-            '''
-            N = 0
-            for row in range(self.nrows):
-                b_tmp = b + self.chair_height * row
-                N += self.chairs_per_row(b_tmp)
-            return floor(N)
+        key = (self.chair_width, self.chair_height, self.nchairs, self.nrows,
+               self.hangle)
+        if key in SOLUTIONS:
+            self.b = SOLUTIONS[key]
+            return self.b
+
+        geometry = GEOMETRY.lookup(self)
+        if geometry:
+            self.b, chairs = geometry
+            self.set_row_table(chairs)
+        else:
+            self.b = self.search_b()
 
+        SOLUTIONS[key] = self.b
+        return self.b
+
+    def search_b(self):
+        '''
+        Searches the distance from the centre to the first row of chairs
+        that fits exactly nchairs.
+        '''
         ncycle = 0
         step = 0.5
         b = 10
         target = self.nchairs
 
+        if self.calc_chairs(b) < target:
+            # Skip the walk up from b in 0.5 steps, the search resumes from
+            # the first step with enough chairs
+            ncycle = self.first_step(b, step, target)
+            b = b + step * ncycle
+            direccao = 0
+
         while True:
             ncycle += 1
             if ncycle >= MAXCYCLE:
@@ -114,7 +181,7 @@ class Hemicycle(object):
             if b <= 0:
                 raise ChairError('Could not find a solution. Aborting.')
 
-            N = calc_chairs(b)
+            N = self.calc_chairs(b)
 
             if N == target:
                 break
@@ -130,28 +197,47 @@ class Hemicycle(object):
                     direccao = 0
                 elif direccao == 1:
                     step = step / 2
-        self.b = b
         return b
 
     inner_radius = property(solve_b)
 
+    def row_geometry(self):
+        '''
+        Returns a list with the (radius, number of chairs, angle between
+        chairs) of each row. It's calculated only once, after solving b.
+        '''
+        if self.row_table is None:
+            self.set_row_table([
+                int(self.chairs_per_row(self.inner_radius +
+                                        self.chair_height * row))
+                for row in range(self.nrows)])
+        return self.row_table
+
+    def set_row_table(self, chairs):
+        '''Builds the row table from the number of chairs of each row'''
+        table = []
+        for row, nchairs in enumerate(chairs):
+            radius = self.inner_radius + self.chair_height * row
+            angle = self.hangle / (nchairs - 1) if nchairs > 1 else 0.0
+            table.append((radius, nchairs, angle))
+        self.row_table = table
+
     def row_radius(self, row):
-        return self.inner_radius + self.chair_height * row
+        return self.row_geometry()[row][0]
 
     def row_chairs(self, row):
         '''Number of chairs in a row '''
-        radius = self.row_radius(row)
-        return int(self.chairs_per_row(radius))
+        return self.row_geometry()[row][1]
 
     def row_angle(self, row):
-        return self.hangle / (self.row_chairs(row) - 1)
+        return self.row_geometry()[row][2]
 
     def rows(self):
-        for r in range(self.nrows):
+        for r, (radius, nchairs, angle) in enumerate(self.row_geometry()):
             row = {}
             row['number'] = r + 1
-            row['radius'] = self.row_radius(r)
-            row['nchairs'] = int(self.chairs_per_row(row['radius']))
+            row['radius'] = radius
+            row['nchairs'] = nchairs
 
             yield row
 
@@ -160,14 +246,122 @@ class Hemicycle(object):
         the hemicycle and its x,y coordinate. The origin of the coordinate
         system used is the hemicycle center'''
 
-        chair_angle = self.start_angle() + self.hangle - (self.row_angle(row) * column)
-        radius = self.row_radius(row)
+        radius, nchairs, angle = self.row_geometry()[row]
+        chair_angle = self.start_angle() + self.hangle - (angle * column)
 
         x = cos(chair_angle) * radius
         y = sin(chair_angle) * radius
 
         return chair_angle, x, y
 
+    def chair_locations(self):
+        '''
+        Returns the location of every chair, as given by chair_location, in
+        a list of rows.
+        '''
+        first_angle = self.start_angle() + self.hangle
+
+        locations = []
+        for radius, nchairs, angle in self.row_geometry():
+            row = []
+            for column in range(nchairs):
+                chair_angle = first_angle - (angle * column)
+                row.append((chair_angle,
+                            cos(chair_angle) * radius,
+                            sin(chair_angle) * radius))
+            locations.append(row)
+        return locations
+
+##
+# Geometry table
+##
+
+
+def hemicycle_rows(nchairs):
+    '''Number of rows used to draw an hemicycle with nchairs'''
+    return (16 if nchairs > 600 else
+            8 if 200 < nchairs <= 600 else
+            6 if 80 < nchairs <= 200 else
+            3 if 40 < nchairs <= 80 else 1)
+
+
+class GeometryTable(object):
+    '''
+    Pre-solved hemicycles, read from a memory mapped file so no solver runs
+    for the usual hemicycles.
+
+    The file has an header with the chair width (half of the width, as in
+    Hemicycle), chair height and hemicycle angle the table was built for,
+    and the range of chairs it covers. It's followed by a record for each
+    number of chairs with the number of rows, the inner radius and the
+    number of chairs on each row. Records with zero rows are hemicycles
+    without solution.
+    '''
+
+    def __init__(self, path=TABLE_FILE):
+        self.data = None
+        self.geometry = None
+        self.first = self.last = 0
+
+        try:
+            with open(path, 'rb') as table_file:
+                self.data = mmap.mmap(table_file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+        except (IOError, ValueError):
+            return
+
+        header = TABLE_HEADER.unpack_from(self.data)
+        if header[0] != TABLE_MAGIC:
+            self.data = None
+            return
+        self.geometry = header[1:4]
+        self.first, self.last = header[4:]
+
+    def lookup(self, hc):
+        '''Returns (inner radius, chairs per row) for hc or None'''
+        if (self.data is None or
+                not self.first <= hc.nchairs <= self.last or
+                (hc.chair_width, hc.chair_height, hc.hangle) != self.geometry):
+            return None
+
+        record = TABLE_RECORD.unpack_from(
+            self.data,
+            TABLE_HEADER.size + (hc.nchairs - self.first) * TABLE_RECORD.size)
+        if record[0] != hc.nrows:
+            return None
+        return record[1], record[2:2 + hc.nrows]
+
+
+def build_table(path=TABLE_FILE, first=TABLE_FIRST, last=TABLE_LAST,
+                chair_width=60, chair_height=60, hangle=pi):
+    '''
+    Solves the hemicycles from first to last chairs, with the number of
+    rows given by hemicycle_rows, and writes the geometry table to path.
+    '''
+    records = []
+    for nchairs in range(first, last + 1):
+        hc = Hemicycle(chair_width, chair_height, nchairs,
+                       hemicycle_rows(nchairs), hangle)
+        try:
+            hc.b = hc.search_b()
+        except (ChairError, ZeroDivisionError):
+            records.append(TABLE_RECORD.pack(0, 0, *([0] * MAXROWS)))
+            continue
+
+        chairs = [int(hc.chairs_per_row(hc.b + hc.chair_height * row))
+                  for row in range(hc.nrows)]
+        records.append(TABLE_RECORD.pack(
+            hc.nrows, hc.b, *(chairs + [0] * (MAXROWS - hc.nrows))))
+
+    with open(path, 'wb') as table_file:
+        table_file.write(TABLE_HEADER.pack(
+            TABLE_MAGIC, float(chair_width) / 2, float(chair_height), hangle,
+            first, last))
+        table_file.write(''.join(records))
+
+
+GEOMETRY = GeometryTable()
+
 
 if __name__ == '__main__':
     hc = Hemicycle(chair_width=60,
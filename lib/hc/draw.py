@@ -8,7 +8,8 @@ This module produces SVG files with hemicycles representations.
 # Imports
 ##
 
-from pysvg.structure import svg, g, defs, use, title
+from pysvg.core import TextContent
+from pysvg.structure import svg, g, defs, title
 from pysvg.builders import TransformBuilder, ShapeBuilder
 from pysvg.shape import path
 from pysvg.style import style
@@ -25,6 +26,12 @@ from chairs import Hemicycle
 SVGBASE = '/home/helder/prg/hc/hc/share/hc'
 TRANSX = 0
 TRANSY = -50
+CHUNK_SIZE = 16384
+PRECISION = 6
+
+# Chair <use> element, with its translation and rotation
+CHAIR_TEMPLATE = ('<use xlink:href="%s" '
+                  'transform="translate(%s,%s) rotate(%s)"%s')
 
 ##
 # Exceptions
@@ -43,6 +50,19 @@ def degrees(angle):
     '''Converts radians to degrees'''
     return angle * 180 / pi
 
+
+def format_number(value, precision=PRECISION):
+    '''
+    value with precision decimal places, without the trailing zeros and
+    the decimal point when they're not needed.
+    '''
+    number = '%.*f' % (precision, value)
+    if '.' in number:
+        number = number.rstrip('0').rstrip('.')
+    if number == '-0':
+        return '0'
+    return number
+
 ##
 #  SGV
 ##
@@ -53,7 +73,7 @@ class HemicycleSGV(object):
     This class creates svg representations of hemicycles.
     '''
 
-    def __init__(self, hc, parties=None):
+    def __init__(self, hc, parties=None, compact=False, precision=PRECISION):
         '''
         hc - hemicycle object
         parties - list with the following structure:
@@ -64,10 +84,15 @@ class HemicycleSGV(object):
                 'background': <background color>
               }, ...
             ]
+        compact - leave out the whitespace between tags and use short ids
+        precision - number of decimal places of the chair coordinates
         '''
         self.hc = hc
         self.parties = parties
         self.chairs = []
+        self.compact = compact
+        self.precision = precision
+        self.chair_end = '/>' if compact else '  />\n'
 
         # Check if the number of chairs in the results matches the
         # calculated hemicycle number of chairs.
@@ -79,43 +104,58 @@ class HemicycleSGV(object):
     def chair_dist(self):
         '''Chair distribution on the hemicycle'''
 
-        def smallest(parties, first_row):
-            '''Returns the number of chairs for the smalest party in parties'''
-            remaining = (sum([party['result'] for party in parties]) -
-                         sum([sum(party['seats']) for party in parties]))
-
-            smallest_party = parties[0]
-
-            dist_seats = sum(smallest_party['seats'])
-            remaining_seats = smallest_party['result'] - dist_seats
-
-            percent = float(remaining_seats) / remaining
-            nc = int(floor(percent * first_row))
-
-            if sum(smallest_party['seats']) == smallest_party['result']:
-                return 0
-
-            return 1 if not nc else nc
+        # Seats already distributed to each party, by id
+        distributed = {}
 
         def fill_row(parties, seats):
-            parties.sort(key=lambda party: party['result'])
+            '''
+            Fills a row, parties must be sorted from the smallest to the
+            largest. Each party gets its share of the seats still left on
+            the row, proportional to its undistributed seats over the
+            undistributed seats of the larger parties, and at least one
+            seat if it still has any to place.
+            '''
+            # Undistributed seats of parties[i:], for each i
+            remaining = [0] * (len(parties) + 1)
+            for i in range(len(parties) - 1, -1, -1):
+                party = parties[i]
+                remaining[i] = (remaining[i + 1] + party['result'] -
+                                distributed[id(party)])
 
             # Find how many seats we have for each party on this row
-            for i in range(len(parties)):
-                party = parties[i]
+            for i, party in enumerate(parties):
+                dist_seats = distributed[id(party)]
+                remaining_seats = party['result'] - dist_seats
+
+                percent = float(remaining_seats) / remaining[i]
+                nc = int(floor(percent * seats))
+
+                if dist_seats == party['result']:
+                    party_row_seats = 0
+                else:
+                    party_row_seats = 1 if not nc else nc
 
-                party_row_seats = smallest(parties[i:], seats)
                 party['seats'].append(party_row_seats)
+                distributed[id(party)] += party_row_seats
                 seats -= party_row_seats
 
         parties = self.parties
         for party in parties:
             party['seats'] = []
+            distributed[id(party)] = 0
 
+        # The first row sorts the parties as given by size, the other rows
+        # sort them by size once they are sorted by order. Both sorts are
+        # stable, so the size order is the same for all the other rows.
         hc = [row['nchairs'] for row in self.hc.rows()]
-        for row in hc:
-            fill_row(parties, row)
-            parties.sort(key=lambda party: party['order'])
+        if hc:
+            by_size = sorted(parties, key=lambda party: party['result'])
+            fill_row(by_size, hc[0])
+            parties[:] = sorted(by_size, key=lambda party: party['order'])
+
+            by_size = sorted(parties, key=lambda party: party['result'])
+            for row in hc[1:]:
+                fill_row(by_size, row)
 
         # Create an hemicicle matrix, each row is empty, we'll fill the
         # rows afterwards
@@ -137,25 +177,23 @@ class HemicycleSGV(object):
         width = self.hc.outer_radius() * 2
         return width, height
 
-    def chair_svg(self, row, column, id_attr):
-        angle, x, y = self.hc.chair_location(row, column)
-
-        width, height = self.svg_dimention()
-
-        # This '30' is half the size of the svg chair, should be configured
-        x = x + width / 2 - 30 * cos(pi / 2 - angle) + TRANSX
-        y = height - y - 30 * sin(pi / 2 - angle) + TRANSY
-
-        # Chair translation and rotation parametrization
-        th = TransformBuilder()
-        th.setRotation('%f' % (90 - degrees(angle)))
-        th.setTranslation('%f,%f' % (x, y))
+    def chair_xml(self, location, href, width, height):
+        '''
+        <use> element of the chair on location, written straight from the
+        chair template without building a pysvg element. href is the already
+        quoted reference to the chair definition and width, height the SVG
+        dimensions.
+        '''
+        angle, x, y = location
 
-        u = use()
-        u._attributes['xlink:href'] = '#%s' % id_attr
-        u.set_transform(th.getTransform())
+        # This '30' is half the size of the svg chair
+        x = x + width / 2 - 30 * sin(angle) + TRANSX
+        y = height - y - 30 * cos(angle) + TRANSY
 
-        return u
+        precision = self.precision
+        return CHAIR_TEMPLATE % (
+            href, format_number(x, precision), format_number(y, precision),
+            format_number(90 - degrees(angle), precision), self.chair_end)
 
     def chair(self, id_attr, color_1, color_2):
         head = ShapeBuilder().createCircle(30, 25, 20, stroke='black', strokewidth=5.0, fill=color_1)
@@ -175,13 +213,26 @@ class HemicycleSGV(object):
 
         return group
 
+    def chair_id(self, i):
+        '''Id of the chair definition of the i-th party'''
+        if self.compact:
+            return 'p%d' % i
+        return self.parties[i]['initials']
+
+    def group_id(self, i):
+        '''Id of the group of the i-th party'''
+        if self.compact:
+            return 'g%d' % i
+        return '%s_group' % self.parties[i]['initials']
+
     def defs(self):
         d = defs()
-        for party in self.parties:
-            d.addElement(self.chair(party['initials'], party['color_1'], party['color_2']))
+        for i, party in enumerate(self.parties):
+            d.addElement(self.chair(self.chair_id(i), party['color_1'], party['color_2']))
         return d
 
-    def svg(self):
+    def document(self):
+        '''Hemicycle SVG document, as a pysvg object tree'''
         if not self.chairs:
             raise SVGError('You need to calculate the chair distribution.')
 
@@ -200,7 +251,7 @@ class HemicycleSGV(object):
             party = self.parties[i]
             groups[i] = g()
             # groups[i].set_fill(party['color'])
-            groups[i].set_id('%s_group' % party['initials'])
+            groups[i].set_id(self.group_id(i))
             t = title()
             t.appendTextContent('Grupo Parlamentar do %s' % party['initials'])
             groups[i].addElement(t)
@@ -208,21 +259,46 @@ class HemicycleSGV(object):
         # Add the chair shape definition
         s.addElement(self.defs())
 
-        # Distribute the chairs
+        # Distribute the chairs, the <use> elements of each group are
+        # written as a single text block
+        hrefs = [s.quote_attrib('#%s' % self.chair_id(i))
+                 for i in range(len(self.parties))]
+        chairs = dict((i, []) for i in range(len(self.parties)))
+        locations = self.hc.chair_locations()
         for row in range(len(self.chairs)):
             for col in range(len(self.chairs[row])):
-                angle, x, y = self.hc.chair_location(row, col)
-                x = x + width / 2
-                y = height - y
+                party = self.chairs[row][col]
+                chairs[party].append(self.chair_xml(
+                    locations[row][col], hrefs[party], width, height))
 
-                groups[self.chairs[row][col]].addElement(self.chair_svg(
-                    row, col, self.parties[self.chairs[row][col]]['initials']))
+        for i in range(len(self.parties)):
+            groups[i].addElement(TextContent(''.join(chairs[i])))
 
         # Insert the party groups into the svg
         for i in range(len(self.parties)):
             s.addElement(groups[i])
 
-        return s.getXML()
+        return s
+
+    def svg(self):
+        return self.document().getXML(self.compact)
+
+    def iter_svg(self, chunk_size=CHUNK_SIZE):
+        '''
+        Yields the SVG document in chunks of about chunk_size bytes, to be
+        used with a streaming response.
+        '''
+        chunks = []
+        size = 0
+        for chunk in self.document().iter_xml(self.compact):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                yield ''.join(chunks)
+                chunks = []
+                size = 0
+        if chunks:
+            yield ''.join(chunks)
 
 
 if __name__ == '__main__':
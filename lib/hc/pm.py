@@ -3,9 +3,33 @@
 '''
 In this module we find the pm distribution on the parliament according to
 various methodologies.
+
+The methods (D'Hondt, Sainte-Laguë, modified Sainte-Laguë and Hare with
+largest remainders) are on METHODS, by name, and share a single divisor
+core.
 '''
 
 
+##
+# Imports
+##
+
+import heapq
+
+##
+# Config
+##
+
+DHONDT = 'dhondt'
+SAINTE_LAGUE = 'sainte-lague'
+MODIFIED_SAINTE_LAGUE = 'modified-sainte-lague'
+HARE = 'hare'
+
+##
+# Methods
+##
+
+
 def hondt_method(seats, parties):
     '''
     seat_number - number of seats on the electoral district being considerd
@@ -20,35 +44,215 @@ def hondt_method(seats, parties):
 
     As described in "Lei 14/79 Artigo 16"
 
-    Additionally a remaining_votes key will be added to each party identifying
-    the votes that didn't contribute to gain a seat.
+    The quotients are kept on a priority queue, so each seat costs
+    O(log(parties)) instead of a full sort of the party list. When two
+    quotients are equal the seat goes to the party that got a seat most
+    recently or, if none of them got one yet, to the first on the list.
+    The returned list is ordered by the quotients of the last attributed
+    seat.
     '''
+    return apportionment_method(seats, parties, DHONDT)
 
-    for party in parties:
-        party['result'] = 0
 
-    while seats:
-        # calculate each party quotient
-        for party in parties:
-            party['quotient'] = float(party['votes']) / (party['result'] + 1)
-        parties.sort(key=lambda party: -party['quotient'])
+def hondt_matrix(votes, seats):
+    '''
+    votes - vote matrix, one row per electoral district and one column per
+        party:
+        [ [<party 1 votes>, <party 2 votes>, ...],
+          ...
+          ]
+    seats - number of seats of each electoral district, in the same order
+        as the vote matrix rows
 
-        # Atribute the MP seat
-        parties[0]['result'] += 1
-        seats -= 1
-
-    # Cleanup
-    for party in parties:
-        try:
-            del party['quotient']
-        except KeyError:
-            # This will be triggered for hemicycles with less seats than
-            # parties
-            pass
+    Batch version of hondt_method, all the electoral districts are
+    processed in one call. Returns a seat matrix with the same shape as
+    the vote matrix. The tie breaking is the same as in hondt_method.
+    '''
+    return apportionment_matrix(votes, seats, DHONDT)
+
+
+def hondt_sweep(seats, votes):
+    '''
+    seats - largest number of seats to consider
+    votes - list with the number of votes of each party
+
+    Allocations for every number of seats from 1 to seats, in a single
+    pass: D'Hondt gives each extra seat to the next highest quotient, so
+    the allocation for n seats is the one for n - 1 plus a seat. Returns
+    the positions in votes that get each seat, in order, the first n items
+    are the allocation for n seats. The tie breaking is the same as in
+    hondt_method.
+    '''
+    return apportionment_sweep(seats, votes, DHONDT)
+
+
+def apportionment_sweep(seats, votes, method=DHONDT):
+    '''
+    hondt_sweep for any of the divisor methods, on DIVISORS. The quota
+    methods can't be swept, an extra seat may take a seat from a party.
+    '''
+    if method not in DIVISORS:
+        raise ValueError('%s is not a divisor method' % method)
+
+    winners = []
+    _divisor(seats, votes, DIVISORS[method], winners)
+    return winners
+
+
+def apportionment_method(seats, parties, method=DHONDT):
+    '''
+    hondt_method for any of the METHODS, parties is changed the same way.
+    '''
+    results, order = apportion(seats, [party['votes'] for party in parties],
+                               method)
+
+    for party, result in zip(parties, results):
+        party['result'] = result
+
+    # Order the parties as they were on the last seat attribution
+    parties[:] = [parties[i] for i in order]
 
     return parties
 
 
+def apportionment_matrix(votes, seats, method=DHONDT):
+    '''
+    hondt_matrix for any of the METHODS.
+    '''
+    apportion_votes = METHODS[method]
+    return [apportion_votes(district_seats, district_votes)[0]
+            for district_votes, district_seats in zip(votes, seats)]
+
+
+def apportion(seats, votes, method=DHONDT):
+    '''
+    seats - number of seats to distribute
+    votes - list with the number of votes of each party
+    method - one of METHODS
+
+    Returns the number of seats for each position in votes and the
+    positions ordered by the quotients, or remainders, left after the last
+    attributed seat.
+    '''
+    return METHODS[method](seats, votes)
+
+##
+# Divisor methods
+##
+
+
+def dhondt_divisor(seats):
+    '''1, 2, 3, ...'''
+    return seats + 1
+
+
+def sainte_lague_divisor(seats):
+    '''1, 3, 5, ...'''
+    return 2 * seats + 1
+
+
+def modified_sainte_lague_divisor(seats):
+    '''1.4, 3, 5, ...'''
+    return 2 * seats + 1 if seats else 1.4
+
+
+def _divisor(seats, votes, divisor, winners=None):
+    '''
+    Divisor methods core, each seat goes to the highest quotient
+    votes / divisor(seats already won). The position that gets each seat
+    is appended to winners, if given.
+    '''
+    results = [0] * len(votes)
+
+    if not seats:
+        return results, range(len(votes))
+
+    # Each heap entry is (-quotient, -last seat, position). Parties without
+    # seats use 1 as the last seat so they lose the ties against the others
+    first = float(divisor(0))
+    heap = [(-v / first, 1, i) for i, v in enumerate(votes)]
+    heapq.heapify(heap)
+
+    for seat in range(seats):
+        # Atribute the MP seat
+        winner = heapq.heappop(heap)
+        i = winner[2]
+        results[i] += 1
+        if winners is not None:
+            winners.append(i)
+
+        if seat < seats - 1:
+            heapq.heappush(heap, (-float(votes[i]) / divisor(results[i]),
+                                  -seat, i))
+
+    heap.sort()
+    return results, [i for _, _, i in [winner] + heap]
+
+
+DIVISORS = {
+    DHONDT: dhondt_divisor,
+    SAINTE_LAGUE: sainte_lague_divisor,
+    MODIFIED_SAINTE_LAGUE: modified_sainte_lague_divisor,
+}
+
+
+def _hondt(seats, votes):
+    '''
+    D'Hondt core, returns the number of seats for each position in votes and
+    the positions ordered by the quotients of the last attributed seat.
+    '''
+    return _divisor(seats, votes, dhondt_divisor)
+
+
+def _sainte_lague(seats, votes):
+    return _divisor(seats, votes, sainte_lague_divisor)
+
+
+def _modified_sainte_lague(seats, votes):
+    return _divisor(seats, votes, modified_sainte_lague_divisor)
+
+##
+# Quota methods
+##
+
+
+def _hare(seats, votes):
+    '''
+    Hare quota and largest remainder: each party gets the integer part of
+    votes / (total votes / seats) and the seats left go to the largest
+    remainders, to the first on the list on a tie. The quotas are computed
+    as votes * seats / total votes, in integers, so there are no rounding
+    errors. Without any votes the seats are given as by D'Hondt.
+    '''
+    total = sum(votes)
+
+    if not seats:
+        return [0] * len(votes), range(len(votes))
+    if not total:
+        return _hondt(seats, votes)
+
+    results = []
+    remainders = []
+    for v in votes:
+        result, remainder = divmod(v * seats, total)
+        results.append(result)
+        remainders.append(remainder)
+
+    order = sorted(range(len(votes)), key=lambda i: -remainders[i])
+    for i in order[:seats - sum(results)]:
+        results[i] += 1
+
+    return results, order
+
+
+METHODS = {
+    DHONDT: _hondt,
+    SAINTE_LAGUE: _sainte_lague,
+    MODIFIED_SAINTE_LAGUE: _modified_sainte_lague,
+    HARE: _hare,
+}
+
+
 if __name__ == '__main__':
     parties = [
         {'initials': 'CDS', 'votes': 36602},
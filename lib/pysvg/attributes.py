@@ -6,12 +6,14 @@ For licensing information please refer to license.txt
 '''
 
 
-class CoreAttrib:
+class CoreAttrib(object):
     """
     The CoreAttrib class defines the attribute set Core.attrib
     that is the core set of attributes that can be present on any element.
     """
 
+    __slots__ = ()
+
     def set_id(self, id):
         self._attributes['id'] = id
 
@@ -37,11 +39,13 @@ class CoreAttrib:
         return self._attributes.get('xml:space')
 
 
-class ConditionalAttrib:
+class ConditionalAttrib(object):
     """
     The ConditionalAttrib class defines the Conditional.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_requiredFeatures(self, requiredFeatures):
         self._attributes['requiredFeatures'] = requiredFeatures
 
@@ -61,11 +65,13 @@ class ConditionalAttrib:
         return self._attributes.get('systemLanguage')
 
 
-class StyleAttrib:
+class StyleAttrib(object):
     """
     The StyleAttrib class defines the Style.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_style(self, style):
         self._attributes['style'] = style
 
@@ -79,11 +85,13 @@ class StyleAttrib:
         return self._attributes.get('class')
 
 
-class GraphicalEventsAttrib:
+class GraphicalEventsAttrib(object):
     """
     The GraphicalEventsAttrib class defines the GraphicalEvents.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_onfocusin(self, onfocusin):
         self._attributes['onfocusin'] = onfocusin
 
@@ -145,11 +153,13 @@ class GraphicalEventsAttrib:
         return self._attributes.get('onload')
 
 
-class CursorAttrib:
+class CursorAttrib(object):
     """
     The CursorAttrib class defines the Cursor.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_cursor(self, cursor):
         self._attributes['cursor'] = cursor
 
@@ -157,11 +167,13 @@ class CursorAttrib:
         return self._attributes.get('cursor')
 
 
-class ExternalAttrib:
+class ExternalAttrib(object):
     """
     The ExternalAttrib class defines the External.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_externalResourcesRequired(self, externalResourcesRequired):
         self._attributes['externalResourcesRequired'] = externalResourcesRequired
 
@@ -169,11 +181,13 @@ class ExternalAttrib:
         return self._attributes.get('externalResourcesRequired')
 
 
-class DocumentEventsAttrib:
+class DocumentEventsAttrib(object):
     """
     The DocumentEventsAttrib class defines the DocumentEvents.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_onunload(self, onunload):
         self._attributes['onunload'] = onunload
 
@@ -211,11 +225,13 @@ class DocumentEventsAttrib:
         return self._attributes.get('onzoom')
 
 
-class OpacityAttrib:
+class OpacityAttrib(object):
     """
     The OpacityAttrib class defines the Opacity.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_opacity(self, opacity):
         self._attributes['opacity'] = opacity
 
@@ -235,11 +251,13 @@ class OpacityAttrib:
         return self._attributes.get('fill-opacity')
 
 
-class PaintAttrib:
+class PaintAttrib(object):
     """
     The PaintAttrib class defines the Paint.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_color(self, color):
         self._attributes['color'] = color
 
@@ -313,11 +331,13 @@ class PaintAttrib:
         return self._attributes.get('stroke-width')
 
 
-class GraphicsAttrib:
+class GraphicsAttrib(object):
     """
     The GraphicsAttrib class defines the Graphics.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_display(self, display):
         self._attributes['display'] = display
 
@@ -355,11 +375,13 @@ class GraphicsAttrib:
         return self._attributes.get('visibility')
 
 
-class MarkerAttrib:
+class MarkerAttrib(object):
     """
     The MarkerAttrib class defines the Marker.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_marker_start(self, marker_start):
         self._attributes['marker-start'] = marker_start
 
@@ -379,11 +401,13 @@ class MarkerAttrib:
         return self._attributes.get('marker-end')
 
 
-class ViewportAttrib:
+class ViewportAttrib(object):
     """
     The ViewportAttrib class defines the Viewport.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_clip(self, clip):
         self._attributes['clip'] = clip
 
@@ -397,11 +421,13 @@ class ViewportAttrib:
         return self._attributes.get('overflow')
 
 
-class FilterAttrib:
+class FilterAttrib(object):
     """
     The FilterAttrib class defines the Filter.attrib attribute sets.
     """
 
+    __slots__ = ()
+
     def set_filter(self, filter):
         self._attributes['filter'] = filter
 
@@ -409,11 +435,13 @@ class FilterAttrib:
         return self._attributes.get('filter')
 
 
-class FilterColorAttrib:
+class FilterColorAttrib(object):
     """
     The FilterColorAttrib class defines the FilterColor.attrib attribute sets.
     """
 
+    __slots__ = ()
+
     def set_color_interpolation_filters(self, color_interpolation_filters):
         self._attributes['color-interpolation-filters'] = color_interpolation_filters
 
@@ -421,11 +449,13 @@ class FilterColorAttrib:
         return self._attributes.get('color-interpolation-filters')
 
 
-class FilterPrimitiveAttrib:
+class FilterPrimitiveAttrib(object):
     """
     The FilterPrimitiveAttrib class defines the FilterPrimitive.attrib attribute sets.
     """
 
+    __slots__ = ()
+
     def set_x(self, x):
         self._attributes['x'] = x
 
@@ -462,6 +492,8 @@ class FilterPrimitiveWithInAttrib(FilterPrimitiveAttrib):
     The FilterPrimitiveWithInAttrib class defines the FilterPrimitiveWithIn.attrib attribute sets.
     """
 
+    __slots__ = ()
+
     def set_in(self, inValue):
         self._attributes['in'] = inValue
 
@@ -469,11 +501,13 @@ class FilterPrimitiveWithInAttrib(FilterPrimitiveAttrib):
         return self._attributes.get('in')
 
 
-class XLinkAttrib:
+class XLinkAttrib(object):
     """
     The XLinkAttrib class defines the XLink.attrib, XLinkRequired.attrib, XLinkEmbed.attrib and XLinkReplace.attrib attribute sets.
     """
 
+    __slots__ = ()
+
     def set_xlink_type(self, xlink_type):
         self._attributes['xlink:type'] = xlink_type
 
@@ -517,11 +551,13 @@ class XLinkAttrib:
         return self.attributes['xlink:actuate']
 
 
-class TextAttrib:
+class TextAttrib(object):
     """
     The TextAttrib class defines the Text.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_writing_mode(self, writing_mode):
         self._attributes['writing-mode'] = writing_mode
 
@@ -529,11 +565,13 @@ class TextAttrib:
         return self.attributes['writing-mode']
 
 
-class TextContentAttrib:
+class TextContentAttrib(object):
     """
     The TextContentAttrib class defines the TextContent.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_alignment_baseline(self, alignment_baseline):
         self._attributes['alignment-baseline'] = alignment_baseline
 
@@ -607,11 +645,13 @@ class TextContentAttrib:
         return self.attributes['word-spacing']
 
 
-class FontAttrib:
+class FontAttrib(object):
     """
     The FontAttrib class defines the Font.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_font_family(self, font_family):
         self._attributes['font-family'] = font_family
 
@@ -655,11 +695,13 @@ class FontAttrib:
         return self.attributes['font-weight']
 
 
-class MaskAttrib:
+class MaskAttrib(object):
     """
     The MaskAttrib class defines the Mask.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_mask(self, mask):
         self._attributes['mask'] = mask
 
@@ -667,11 +709,13 @@ class MaskAttrib:
         return self._attributes.get('mask')
 
 
-class ClipAttrib:
+class ClipAttrib(object):
     """
     The ClipAttrib class defines the Clip.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_clip_path(self, clip_path):
         self._attributes['clip-path'] = clip_path
 
@@ -685,11 +729,13 @@ class ClipAttrib:
         return self._attributes.get('clip-rule')
 
 
-class GradientAttrib:
+class GradientAttrib(object):
     """
     The GradientAttrib class defines the Gradient.attrib attribute set.
     """
 
+    __slots__ = ()
+
     def set_stop_color(self, stop_color):
         self._attributes['stop-color'] = stop_color
 
@@ -703,12 +749,14 @@ class GradientAttrib:
         return self._attributes.get('stop-opacity')
 
 
-class PresentationAttributes_Color:
+class PresentationAttributes_Color(object):
     """
     The PresentationAttributes_Color class defines the PresentationAttributes_Color.attrib attribute set.
     The following presentation attributes have to do with specifying color.
     """
 
+    __slots__ = ()
+
     def set_color(self, color):
         self._attributes['color'] = color
 
@@ -728,12 +776,14 @@ class PresentationAttributes_Color:
         return self._attributes.get('color-rendering')
 
 
-class PresentationAttributes_Containers:
+class PresentationAttributes_Containers(object):
     """
     The PresentationAttributes_Containers class defines the PresentationAttributes_Containers.attrib attribute set.
     The following presentation attributes apply to container elements.
     """
 
+    __slots__ = ()
+
     def set_enable_background(self, enableBackground):
         self._attributes['enable-background'] = enableBackground
 
@@ -741,12 +791,14 @@ class PresentationAttributes_Containers:
         return self._attributes.get('enable-background')
 
 
-class PresentationAttributes_feFlood:
+class PresentationAttributes_feFlood(object):
     """
     The PresentationAttributes_feFlood class defines the PresentationAttributes_feFlood.attrib attribute set.
     The following presentation attributes apply to 'feFlood' elements.
     """
 
+    __slots__ = ()
+
     def set_flood_color(self, flood_color):
         self._attributes['flood-color'] = flood_color
 
@@ -760,12 +812,14 @@ class PresentationAttributes_feFlood:
         return self._attributes.get('flood-opacity')
 
 
-class PresentationAttributes_FilterPrimitives:
+class PresentationAttributes_FilterPrimitives(object):
     """
     The PresentationAttributes_FilterPrimitives class defines the PresentationAttributes_FilterPrimitives.attrib attribute set.
     The following presentation attributes apply to filter primitives
     """
 
+    __slots__ = ()
+
     def set_color_interpolation_filters(self, color_interpolation_filters):
         self._attributes['color-interpolation-filters'] = color_interpolation_filters
 
@@ -773,12 +827,14 @@ class PresentationAttributes_FilterPrimitives:
         return self._attributes.get('color-interpolation-filters')
 
 
-class PresentationAttributes_FillStroke:
+class PresentationAttributes_FillStroke(object):
     """
     The PresentationAttributes_FillStroke class defines the PresentationAttributes_FillStroke.attrib attribute set.
     The following presentation attributes apply to filling and stroking operations.
     """
 
+    __slots__ = ()
+
     def set_fill(self, fill):
         self._attributes['fill'] = fill
 
@@ -852,6 +908,8 @@ class PresentationAttributes_FontSpecification(FontAttrib):
     The following presentation attributes have to do with selecting a font to use.
     """
 
+    __slots__ = ()
+
 
 class PresentationAttributes_Gradients(GradientAttrib):
     """
@@ -859,6 +917,8 @@ class PresentationAttributes_Gradients(GradientAttrib):
     The following presentation attributes apply to gradient 'stop' elements.
     """
 
+    __slots__ = ()
+
 
 class PresentationAttributes_Graphics(ClipAttrib, CursorAttrib, GraphicsAttrib, MaskAttrib, FilterAttrib):
     """
@@ -866,6 +926,8 @@ class PresentationAttributes_Graphics(ClipAttrib, CursorAttrib, GraphicsAttrib,
     The following presentation attributes apply to graphics elements
     """
 
+    __slots__ = ()
+
     def set_opacity(self, opacity):
         self._attributes['opacity'] = opacity
 
@@ -873,12 +935,14 @@ class PresentationAttributes_Graphics(ClipAttrib, CursorAttrib, GraphicsAttrib,
         return self._attributes.get('opacity')
 
 
-class PresentationAttributes_Images:
+class PresentationAttributes_Images(object):
     """
     The PresentationAttributes_Images class defines the PresentationAttributes_Images.attrib attribute set.
     The following presentation attributes apply to 'image' elements
     """
 
+    __slots__ = ()
+
     def set_color_profile(self, color_profile):
         self._attributes['color-profile'] = color_profile
 
@@ -886,12 +950,14 @@ class PresentationAttributes_Images:
         return self._attributes.get('color-profile')
 
 
-class PresentationAttributes_LightingEffects:
+class PresentationAttributes_LightingEffects(object):
     """
     The PresentationAttributes_LightingEffects class defines the PresentationAttributes_LightingEffects.attrib attribute set.
     The following presentation attributes apply to 'feDiffuseLighting' and 'feSpecularLighting' elements
     """
 
+    __slots__ = ()
+
     def set_lighting_color(self, lighting_color):
         self._attributes['lighting-color'] = lighting_color
 
@@ -905,6 +971,8 @@ class PresentationAttributes_Marker(MarkerAttrib):
     The following presentation attributes apply to marker operations
     """
 
+    __slots__ = ()
+
 
 class PresentationAttributes_TextContentElements(TextContentAttrib):
     """
@@ -912,26 +980,36 @@ class PresentationAttributes_TextContentElements(TextContentAttrib):
     The following presentation attributes apply to text content elements
     """
 
+    __slots__ = ()
+
 
 class PresentationAttributes_TextElements(TextAttrib):
     """
     The following presentation attributes apply to 'text' elements
     """
 
+    __slots__ = ()
+
 
 class PresentationAttributes_Viewports(ViewportAttrib):
     """
     The following presentation attributes apply to elements that establish viewports
     """
 
+    __slots__ = ()
+
 
 class PresentationAttributes_All(PresentationAttributes_Color, PresentationAttributes_Containers, PresentationAttributes_feFlood, PresentationAttributes_FillStroke, PresentationAttributes_FilterPrimitives, PresentationAttributes_FontSpecification, PresentationAttributes_Gradients, PresentationAttributes_Graphics, PresentationAttributes_Images, PresentationAttributes_LightingEffects, PresentationAttributes_Marker, PresentationAttributes_TextContentElements, PresentationAttributes_TextElements, PresentationAttributes_Viewports):
     """
     The PresentationAttributes_All class defines the Presentation.attrib attribute set.
     """
 
+    __slots__ = ()
 
-class ColorAttrib:
+
+class ColorAttrib(object):
     """
     The ColorAttrib class defines the Color.attrib attribute set.
     """
+
+    __slots__ = ()
@@ -7,11 +7,13 @@ For licensing information please refer to license.txt
 from attributes import CoreAttrib, ConditionalAttrib, StyleAttrib, GraphicalEventsAttrib, PaintAttrib, OpacityAttrib, GraphicsAttrib, CursorAttrib, FilterAttrib, MaskAttrib, ClipAttrib
 
 
-class TextContent:
+class TextContent(object):
     """
     Class for the text content of an xml element. Can also include PCDATA
     """
 
+    __slots__ = ('content',)
+
     def __init__(self, content):
         self.content = content
 
@@ -21,13 +23,18 @@ class TextContent:
     def getXML(self):
         return self.content
 
+    def iter_xml(self, compact=False):
+        yield str(self.content)
+
 
-class BaseElement:
+class BaseElement(object):
     """
     This is the base class for all svg elements like title etc. It provides common functionality.
     It should NOT be directly used by anyone.
     """
 
+    __slots__ = ('_elementName', '_attributes', '_textContent', '_subElements')
+
     def __init__(self, elementName):
         """
         initializes the object
@@ -37,44 +44,72 @@ class BaseElement:
         self._elementName = elementName
         self._attributes = {}  # key value
         self._textContent = ""
-        self._subElements = []
+        # The list is only created when the first sub element is added
+        self._subElements = ()
 
     def appendTextContent(self, text):
         self.addElement(TextContent(text))
 
     def addElement(self, element):
-        self._subElements.append(element)
+        if not self._subElements:
+            self._subElements = [element]
+        else:
+            self._subElements.append(element)
 
     def getElementAt(self, pos):
         return self._subElements[pos]
 
     def insertElementAt(self, element, pos):
+        if not self._subElements:
+            self._subElements = []
         return self._subElements.insert(pos, element)
 
-    def getXML(self):
+    def getXML(self, compact=False):
         """
         Return a XML representation of the current element.
         This function can be used for debugging purposes. It is also used by getXML in SVG
 
+        @type  compact: boolean
+        @param compact: leave out the whitespace between tags and attributes
         @return:  the representation of the current element as an xml string
         """
+        return ''.join(self.iter_xml(compact))
+
+    def iter_xml(self, compact=False):
+        """
+        Return a XML representation of the current element in chunks, one
+        for each tag or text content. Unlike getXML the whole document is
+        never held in memory.
+
+        @type  compact: boolean
+        @param compact: leave out the whitespace between tags and attributes
+        @return:  generator of xml strings
+        """
         xml = '<' + self._elementName + ' '
         for key, value in self._attributes.items():
             if value != None:
                 xml += key + '="' + self.quote_attrib(str(value)) + '" '
+        if compact:
+            xml = xml[:-1]
+            empty_end, start_end, end_end = '/>', '>', '>'
+        else:
+            empty_end, start_end, end_end = ' />\n', ' >\n', '>\n'
         if len(self._subElements) == 0:  # self._textContent==None and
-            xml += ' />\n'
+            yield xml + empty_end
         else:
-            xml += ' >\n'
-            # if self._textContent==None:
+            yield xml + start_end
             for subelement in self._subElements:
-                xml += str(subelement.getXML())
-            # else:
-            # if self._textContent!=None:
-            #    xml+=self._textContent
-            xml += '</' + self._elementName + '>\n'
-        # print xml
-        return xml
+                for chunk in subelement.iter_xml(compact):
+                    yield chunk
+            yield '</' + self._elementName + end_end
+
+    def write_to(self, fp, compact=False):
+        """
+        Writes the XML representation of the current element to the file
+        like object fp.
+        """
+        for chunk in self.iter_xml(compact):
+            fp.write(chunk)
 
     # generic methods to set and get atributes (should only be used if something is not supported yet
     def setAttribute(self, attribute_name, attribute_value):
@@ -110,7 +145,8 @@ class BaseElement:
         Calling this method only makes sense if the root element is an svg elemnt
         """
         f = open(filename, 'w')
-        f.write(self.wrap_xml(self.getXML(), encoding, standalone))
+        f.write(self.wrap_xml('', encoding, standalone))
+        self.write_to(f)
         f.close()
 
     def quote_attrib(self, inStr):
@@ -137,11 +173,13 @@ class BaseElement:
 #--------------------------------------------------------------------------#
 
 
-class PointAttrib:
+class PointAttrib(object):
     """
     The PointAttrib class defines x and y.
     """
 
+    __slots__ = ()
+
     def set_x(self, x):
         self._attributes['x'] = x
 
@@ -155,11 +193,13 @@ class PointAttrib:
         return self._attributes.get('y')
 
 
-class DeltaPointAttrib:
+class DeltaPointAttrib(object):
     """
     The DeltaPointAttrib class defines dx and dy.
     """
 
+    __slots__ = ()
+
     def set_dx(self, dx):
         self._attributes['dx'] = dx
 
@@ -173,11 +213,13 @@ class DeltaPointAttrib:
         return self._attributes.get('dy')
 
 
-class PointToAttrib:
+class PointToAttrib(object):
     """
     The PointToAttrib class defines x2 and y2.
     """
 
+    __slots__ = ()
+
     def set_x2(self, x2):
         self._attributes['x2'] = x2
 
@@ -191,11 +233,13 @@ class PointToAttrib:
         return self._attributes.get('y2')
 
 
-class DimensionAttrib:
+class DimensionAttrib(object):
     """
     The DimensionAttrib class defines height and width.
     """
 
+    __slots__ = ()
+
     def set_height(self, height):
         self._attributes['height'] = height
 
@@ -209,11 +253,13 @@ class DimensionAttrib:
         return self._attributes.get('width')
 
 
-class RotateAttrib:
+class RotateAttrib(object):
     """
     The RotateAttrib class defines rotation.
     """
 
+    __slots__ = ()
+
     def set_rotate(self, rotate):
         self._attributes['rotate'] = rotate
 
@@ -226,6 +272,8 @@ class BaseShape(BaseElement, CoreAttrib, ConditionalAttrib, StyleAttrib, Graphic
     Baseclass for all shapes. Do not use this class directly. There is no svg element for it
     """
 
+    __slots__ = ()
+
     def set_transform(self, transform):
         self._attributes['transform'] = transform
 
@@ -13,6 +13,8 @@ class rect(BaseShape, PointAttrib, DimensionAttrib):
     Class representing the rect element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, x=None, y=None, width=None, height=None, rx=None, ry=None, **kwargs):
         BaseElement.__init__(self, 'rect')
         self.set_x(x)
@@ -109,6 +111,8 @@ class circle(BaseShape):
     Class representing the circle element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, cx=None, cy=None, r=None, **kwargs):
         BaseElement.__init__(self, 'circle')
         self.set_cx(cx)
@@ -194,6 +198,8 @@ class ellipse(BaseShape):
     Class representing the ellipse element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, cx=None, cy=None, rx=None, ry=None, **kwargs):
         BaseElement.__init__(self, 'ellipse')
         self.set_cx(cx)
@@ -269,6 +275,8 @@ class line(BaseShape, PointToAttrib):
     a style including STROKE and STROKE-WIDTH
     """
 
+    __slots__ = ()
+
     def __init__(self, X1=None, Y1=None, X2=None, Y2=None, **kwargs):
         """
         Creates a line
@@ -422,6 +430,8 @@ class path(BaseShape, ExternalAttrib, MarkerAttrib):
     Class representing the path element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, pathData="", pathLength=None, style=None, focusable=None, **kwargs):
         BaseElement.__init__(self, 'path')
         if pathData != '' and not pathData.endswith(' '):
@@ -492,6 +502,8 @@ class polyline(BaseShape):
     Class representing the polyline element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, points=None, **kwargs):
         BaseElement.__init__(self, 'polyline')
         self.set_points(points)
@@ -509,6 +521,8 @@ class polygon(polyline):
     Class representing the polygon element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, points=None, **kwargs):
         BaseElement.__init__(self, 'polygon')
         self.set_points(points)
@@ -15,6 +15,8 @@ class g(BaseElement, CoreAttrib, ConditionalAttrib, StyleAttrib, ExternalAttrib,
     Class representing the g element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'g')
         self.setKWARGS(**kwargs)
@@ -31,6 +33,8 @@ class defs(g):
     Class representing the defs element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'defs')
         self.setKWARGS(**kwargs)
@@ -41,6 +45,8 @@ class desc(BaseElement, CoreAttrib, StyleAttrib):
     Class representing the desc element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'desc')
         self.setKWARGS(**kwargs)
@@ -51,6 +57,8 @@ class title(desc):
     Class representing the title element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'title')
         self.setKWARGS(**kwargs)
@@ -61,6 +69,8 @@ class metadata(BaseElement, CoreAttrib):
     Class representing the metadata element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'metadata')
         self.setKWARGS(**kwargs)
@@ -71,6 +81,8 @@ class symbol(BaseElement, CoreAttrib, StyleAttrib, ExternalAttrib, PresentationA
     Class representing the symbol element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'symbol')
         self.setKWARGS(**kwargs)
@@ -93,6 +105,8 @@ class use(BaseElement, CoreAttrib, StyleAttrib, ConditionalAttrib, PointAttrib,
     Class representing the use element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'use')
         self.setKWARGS(**kwargs)
@@ -109,6 +123,8 @@ class svg(BaseElement, CoreAttrib, StyleAttrib, ConditionalAttrib, PointAttrib,
     Class representing the svg element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, x=None, y=None, width=None, height=None, **kwargs):
         BaseElement.__init__(self, 'svg')
         self.set_xmlns('http://www.w3.org/2000/svg')
@@ -187,6 +203,8 @@ class image(BaseElement, CoreAttrib, ConditionalAttrib, StyleAttrib, ViewportAtt
     Class representing the image element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, x=None, y=None, width=None, height=None, preserveAspectRatio=None, **kwargs):
         BaseElement.__init__(self, 'image')
         self.set_x(x)
@@ -217,6 +235,8 @@ class switch(BaseElement, CoreAttrib, ConditionalAttrib, StyleAttrib, Presentati
     Class representing the switch element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         BaseElement.__init__(self, 'switch')
         self.setKWARGS(**kwargs)
@@ -233,6 +253,8 @@ class clipPath(BaseElement, CoreAttrib, ConditionalAttrib, StyleAttrib, External
     Class representing the clipPath element of an svg doc.
     """
 
+    __slots__ = ()
+
     def __init__(self, id=None, transform=None, clipPathUnits=None, **kwargs):
         BaseElement.__init__(self, 'clipPath')
         self.set_id(id)